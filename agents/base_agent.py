@@ -34,6 +34,7 @@ class BaseAgent(ABC):
         """Async context manager exit."""
         if self.openrouter:
             await self.openrouter.__aexit__(exc_type, exc_val, exc_tb)
+            self.openrouter = None
 
     async def log_action(
         self,
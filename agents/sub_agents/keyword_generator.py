@@ -6,8 +6,7 @@ import logging
 from typing import Dict, Any, List
 
 from ..base_agent import BaseAgent
-from database.connection import get_db_session
-from database.models import Keyword
+from database.connection import bulk_insert_keywords
 
 logger = logging.getLogger(__name__)
 
@@ -251,34 +250,29 @@ Focus on:
         if not self.session_id:
             return
 
-        async with get_db_session() as session:
-            # Store keywords
-            for keyword in keywords:
-                keyword_type = "hashtag" if keyword.startswith('#') else "keyword"
-                actual_keyword = keyword[1:] if keyword.startswith('#') else keyword
-
-                db_keyword = Keyword(
-                    session_id=self.session_id,
-                    keyword=actual_keyword,
-                    keyword_type=keyword_type,
-                    relevance_score=keyword_scores.get(keyword, 0.0),
-                    category="generated"
-                )
-                session.add(db_keyword)
-
-            # Store hashtags separately if not already included
-            for hashtag in hashtags:
-                if hashtag not in keywords:
-                    db_hashtag = Keyword(
-                        session_id=self.session_id,
-                        keyword=hashtag[1:] if hashtag.startswith('#') else hashtag,
-                        keyword_type="hashtag",
-                        relevance_score=0.8,  # Default high score for curated hashtags
-                        category="social_media"
-                    )
-                    session.add(db_hashtag)
-
-            await session.commit()
+        # Store keywords
+        rows = []
+        for keyword in keywords:
+            is_hashtag = keyword.startswith('#')
+            rows.append({
+                "keyword": keyword[1:] if is_hashtag else keyword,
+                "keyword_type": "hashtag" if is_hashtag else "keyword",
+                "relevance_score": keyword_scores.get(keyword, 0.0),
+                "category": "generated"
+            })
+
+        # Store hashtags separately if not already included
+        included = set(keywords)
+        for hashtag in hashtags:
+            if hashtag not in included:
+                rows.append({
+                    "keyword": hashtag[1:] if hashtag.startswith('#') else hashtag,
+                    "keyword_type": "hashtag",
+                    "relevance_score": 0.8,  # Default high score for curated hashtags
+                    "category": "social_media"
+                })
+
+        await bulk_insert_keywords(self.session_id, rows)
 
     def _categorize_keywords(self, keywords: List[str]) -> Dict[str, List[str]]:
         """Categorize keywords by type and intent."""
@@ -6,8 +6,7 @@ from typing import Dict, Any, List, Optional
 from urllib.parse import urlparse
 
 from ..base_agent import BaseAgent
-from database.connection import get_db_session
-from database.models import ResearchResult
+from database.connection import bulk_insert_research
 from services.search_api import SearchAPI
 from services.web_scraper import WebScraper
 
@@ -365,20 +364,18 @@ Please provide a comprehensive summary of these findings."""
         if not self.session_id:
             return
 
-        async with get_db_session() as session:
-            for result in results:
-                research_result = ResearchResult(
-                    session_id=self.session_id,
-                    source_url=result.get('url', ''),
-                    title=result.get('title', ''),
-                    content=result.get('content', result.get('snippet', '')),
-                    relevance_score=result.get('relevance_score', 0.0),
-                    credibility_score=result.get('credibility_score', 0.0),
-                    metadata=json.dumps({
-                        'key_insights': result.get('key_insights', []),
-                        'content_type': result.get('content_type', 'unknown'),
-                        'source': result.get('source', '')
-                    })
-                )
-                session.add(research_result)
-            await session.commit()
\ No newline at end of file
+        await bulk_insert_research(self.session_id, [
+            {
+                "source_url": result.get('url', ''),
+                "title": result.get('title', ''),
+                "content": result.get('content', result.get('snippet', '')),
+                "relevance_score": result.get('relevance_score', 0.0),
+                "credibility_score": result.get('credibility_score', 0.0),
+                "extra_metadata": {
+                    'key_insights': result.get('key_insights', []),
+                    'content_type': result.get('content_type', 'unknown'),
+                    'source': result.get('source', '')
+                }
+            }
+            for result in results
+        ])
\ No newline at end of file
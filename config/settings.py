@@ -34,6 +34,8 @@ class SystemConfig:
         """Load configuration from environment variables"""
         self.openrouter_api_key = os.getenv("OPENROUTER_API_KEY")
         self.database_url = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./agentic_system.db")
+        self.db_pool_size = int(os.getenv("DB_POOL_SIZE", "20"))
+        self.db_max_overflow = int(os.getenv("DB_MAX_OVERFLOW", "10"))
         self.log_level = os.getenv("LOG_LEVEL", "INFO")
         self.max_retries = int(os.getenv("MAX_RETRIES", "3"))
         self.timeout_seconds = int(os.getenv("TIMEOUT_SECONDS", "120"))
@@ -42,11 +44,14 @@ class SystemConfig:
         self.google_api_key = os.getenv("GOOGLE_API_KEY")
         self.google_cse_id = os.getenv("GOOGLE_CSE_ID")
         self.bing_api_key = os.getenv("BING_API_KEY")
+        self.perplexity_api_key = os.getenv("PERPLEXITY_API_KEY")
 
         # Web scraping config (legacy - not currently used)
         self.user_agent = os.getenv("USER_AGENT", "AgenticSystem/1.0.0")
         self.max_concurrent_requests = int(os.getenv("MAX_CONCURRENT_REQUESTS", "10"))
         self.request_delay = float(os.getenv("REQUEST_DELAY", "1.0"))
+        self.metadata_head_only = os.getenv("METADATA_HEAD_ONLY", "false").lower() == "true"
+        self.fast_parser = os.getenv("FAST_PARSER", "false").lower() == "true"
 
     def setup_models(self):
         """Configure OpenRouter models - matches actual usage in the system"""
@@ -1,9 +1,11 @@
 """Database connection and initialization utilities."""
 
 import asyncio
+from contextlib import asynccontextmanager
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy import text
-from typing import Optional
+from sqlalchemy import insert, make_url, text, update
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from datetime import datetime
 import logging
 
 from .models import Base
@@ -11,25 +13,38 @@ from config.settings import config
 
 logger = logging.getLogger(__name__)
 
-# Global database engine and session factory
+# Global database engine and the session factory bound to its connection pool
 _engine = None
-_async_session_maker = None
+AsyncSessionLocal: Optional[async_sessionmaker] = None
+
+# Buffered agent logs, written in batches by a background flusher
+_LOG_BATCH_SIZE = 500
+_LOG_FLUSH_INTERVAL = 1.0
+_log_queue: Optional[asyncio.Queue] = None
+_log_flusher_task: Optional[asyncio.Task] = None
 
 async def init_database() -> None:
     """Initialize the database engine and create all tables."""
-    global _engine, _async_session_maker
+    global _engine, AsyncSessionLocal
 
     if _engine is None:
+        url = make_url(config.database_url)
+        pool_kwargs = {}
+        if url.database not in (None, "", ":memory:"):
+            # In-memory SQLite uses a single static connection and takes no pool sizing
+            pool_kwargs = {"pool_size": config.db_pool_size, "max_overflow": config.db_max_overflow}
+
         # Create async engine
         _engine = create_async_engine(
             config.database_url,
             echo=False,  # Set to True for SQL query logging
             pool_pre_ping=True,
             pool_recycle=300,
+            **pool_kwargs,
         )
 
         # Create session factory
-        _async_session_maker = async_sessionmaker(
+        AsyncSessionLocal = async_sessionmaker(
             _engine,
             class_=AsyncSession,
             expire_on_commit=False
@@ -39,21 +54,26 @@ async def init_database() -> None:
         async with _engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
 
+        _start_log_flusher()
         logger.info("Database initialized successfully")
 
-def get_db_session() -> AsyncSession:
-    """Get a database session."""
-    if _async_session_maker is None:
+@asynccontextmanager
+async def get_db_session() -> AsyncIterator[AsyncSession]:
+    """Get a database session from the shared pool."""
+    if AsyncSessionLocal is None:
         raise RuntimeError("Database not initialized. Call init_database() first.")
 
-    return _async_session_maker()
+    async with AsyncSessionLocal() as session:
+        yield session
 
 async def close_database() -> None:
     """Close the database engine."""
-    global _engine
+    global _engine, AsyncSessionLocal
+    await _stop_log_flusher()
     if _engine:
         await _engine.dispose()
         _engine = None
+        AsyncSessionLocal = None
         logger.info("Database connection closed")
 
 async def check_database_health() -> bool:
@@ -77,20 +97,58 @@ async def create_session_record(topic: str, analysis: Optional[str] = None) -> i
         await session.refresh(new_session)
         return new_session.id
 
+async def create_session_records(topics: Sequence[Tuple[str, Optional[str]]]) -> List[int]:
+    """Create session records for many (topic, analysis) pairs and return their IDs in order."""
+    from .models import Session
+
+    if not topics:
+        return []
+
+    async with get_db_session() as session:
+        stmt = insert(Session).returning(Session.id, sort_by_parameter_order=True)
+        result = await session.execute(
+            stmt,
+            [{"topic": topic, "analysis": analysis, "status": "active"} for topic, analysis in topics]
+        )
+        ids = [row[0] for row in result]
+        await session.commit()
+        return ids
+
+async def bulk_insert_keywords(session_id: int, keywords: List[Dict[str, Any]]) -> None:
+    """Insert many keyword rows for a session in a single statement."""
+    from .models import Keyword
+
+    if not keywords:
+        return
+
+    async with get_db_session() as session:
+        await session.execute(insert(Keyword), [{**row, "session_id": session_id} for row in keywords])
+        await session.commit()
+
+async def bulk_insert_research(session_id: int, results: List[Dict[str, Any]]) -> None:
+    """Insert many research result rows for a session in a single statement."""
+    from .models import ResearchResult
+
+    if not results:
+        return
+
+    async with get_db_session() as session:
+        await session.execute(insert(ResearchResult), [{**row, "session_id": session_id} for row in results])
+        await session.commit()
+
 async def update_session_status(session_id: int, status: str, error_message: Optional[str] = None) -> None:
-    """Update session status."""
+    """Update session status in a single UPDATE statement."""
     from .models import Session
-    from datetime import datetime
+
+    values: Dict[str, Any] = {"status": status}
+    if status == 'completed':
+        values["completed_at"] = datetime.utcnow()
+    if error_message:
+        values["error_message"] = error_message
 
     async with get_db_session() as session:
-        db_session = await session.get(Session, session_id)
-        if db_session:
-            db_session.status = status
-            if status == 'completed':
-                db_session.completed_at = datetime.utcnow()
-            if error_message:
-                db_session.error_message = error_message
-            await session.commit()
+        await session.execute(update(Session).where(Session.id == session_id).values(**values))
+        await session.commit()
 
 async def log_agent_action(
     session_id: int,
@@ -102,23 +160,118 @@ async def log_agent_action(
     success: bool = True,
     error_message: Optional[str] = None
 ) -> None:
-    """Log an agent action to the database."""
+    """Queue an agent action for the next batched write to the database.
+
+    This is fire-and-forget: rows are written by a background flusher, and a row the
+    database rejects is logged and dropped rather than raised to the caller.
+    """
+    _start_log_flusher()
+    _log_queue.put_nowait({
+        "session_id": session_id,
+        "agent_name": agent_name,
+        "action": action,
+        "input_data": input_data,
+        "output_data": output_data,
+        "timestamp": datetime.utcnow(),
+        "duration_ms": duration_ms,
+        "success": success,
+        "error_message": error_message,
+    })
+
+async def log_agent_actions_bulk(rows: List[Dict[str, Any]]) -> None:
+    """Insert many agent log rows in a single statement and commit."""
     from .models import AgentLog
 
+    if not rows:
+        return
+
     async with get_db_session() as session:
-        log_entry = AgentLog(
-            session_id=session_id,
-            agent_name=agent_name,
-            action=action,
-            input_data=input_data,
-            output_data=output_data,
-            duration_ms=duration_ms,
-            success=success,
-            error_message=error_message
-        )
-        session.add(log_entry)
+        await session.execute(insert(AgentLog), rows)
         await session.commit()
 
+async def flush_agent_logs() -> None:
+    """Write every queued agent log in one batch."""
+    if _log_queue is None or _log_queue.empty():
+        return
+
+    rows = []
+    while not _log_queue.empty():
+        rows.append(_log_queue.get_nowait())
+    await log_agent_actions_bulk(rows)
+
+def _start_log_flusher() -> None:
+    """Create the log queue and its background flusher on the running loop if needed."""
+    global _log_queue, _log_flusher_task
+
+    if _log_queue is None:
+        _log_queue = asyncio.Queue()
+    if _log_flusher_task is None or _log_flusher_task.done():
+        _log_flusher_task = asyncio.create_task(_log_flusher())
+
+async def _log_flusher() -> None:
+    """Drain the log queue every _LOG_FLUSH_INTERVAL seconds or _LOG_BATCH_SIZE entries.
+
+    A ``None`` entry asks the flusher to write what it holds and exit.
+    """
+    loop = asyncio.get_running_loop()
+    entry = {}
+    while entry is not None:
+        rows = []
+        entry = await _log_queue.get()
+        deadline = loop.time() + _LOG_FLUSH_INTERVAL
+        while entry is not None:
+            rows.append(entry)
+            if len(rows) >= _LOG_BATCH_SIZE:
+                break
+            if not _log_queue.empty():
+                entry = _log_queue.get_nowait()
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                entry = await asyncio.wait_for(_log_queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+
+        if rows:
+            await _write_agent_logs(rows)
+
+async def _write_agent_logs(rows: List[Dict[str, Any]]) -> None:
+    """Write a batch of agent logs, splitting it in halves on failure so only bad rows are lost."""
+    try:
+        await log_agent_actions_bulk(rows)
+    except Exception as e:
+        if len(rows) == 1:
+            row = rows[0]
+            logger.error(
+                f"Failed to write agent log {row['agent_name']}/{row['action']} "
+                f"for session {row['session_id']}: {e}"
+            )
+            return
+        middle = len(rows) // 2
+        await _write_agent_logs(rows[:middle])
+        await _write_agent_logs(rows[middle:])
+
+async def _stop_log_flusher() -> None:
+    """Let the background flusher finish its queue, then write anything left over."""
+    global _log_queue, _log_flusher_task
+
+    if _log_flusher_task is not None:
+        if not _log_flusher_task.done():
+            _log_queue.put_nowait(None)
+            await _log_flusher_task
+        _log_flusher_task = None
+
+    if _log_queue is not None and not _log_queue.empty():
+        rows = []
+        while not _log_queue.empty():
+            rows.append(_log_queue.get_nowait())
+        await _write_agent_logs(rows)
+
+    # The queue is tied to this event loop; the next init starts a fresh one
+    _log_queue = None
+
 async def log_agent_handoff(
     session_id: int,
     from_agent: str,
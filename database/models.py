@@ -1,19 +1,35 @@
 """SQLAlchemy models for the agentic system."""
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, Boolean
+import json
+
+from sqlalchemy import BigInteger, Column, Integer, String, Text, DateTime, Float, ForeignKey, Boolean
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
+from sqlalchemy.types import TypeDecorator
 from datetime import datetime
 
 Base = declarative_base()
 
+# 64-bit session ids; SQLite only autoincrements a plain INTEGER primary key
+SessionID = BigInteger().with_variant(Integer, "sqlite")
+
+class JSONText(TypeDecorator):
+    """Text column holding JSON; strings are stored as-is, other values are serialized on write"""
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, str):
+            return value
+        return json.dumps(value, default=str)
+
 class Session(Base):
     """Represents a complete agent workflow session"""
     __tablename__ = 'sessions'
 
-    id = Column(Integer, primary_key=True, autoincrement=True)
+    id = Column(SessionID, primary_key=True, autoincrement=True)
     topic = Column(Text, nullable=False)
-    analysis = Column(Text)  # JSON string of topic analysis
+    analysis = Column(JSONText)  # JSON string of topic analysis
     created_at = Column(DateTime, default=datetime.utcnow)
     completed_at = Column(DateTime)
     status = Column(String(50), default='active')  # active, completed, failed, cancelled
@@ -31,11 +47,11 @@ class AgentLog(Base):
     __tablename__ = 'agent_logs'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    session_id = Column(Integer, ForeignKey('sessions.id'), nullable=False)
+    session_id = Column(SessionID, ForeignKey('sessions.id'), nullable=False)
     agent_name = Column(String(100), nullable=False)
     action = Column(String(200), nullable=False)
-    input_data = Column(Text)  # JSON string
-    output_data = Column(Text)  # JSON string
+    input_data = Column(JSONText)  # JSON string
+    output_data = Column(JSONText)  # JSON string
     timestamp = Column(DateTime, default=datetime.utcnow)
     duration_ms = Column(Integer)
     success = Column(Boolean, default=True)
@@ -49,14 +65,14 @@ class ResearchResult(Base):
     __tablename__ = 'research_results'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    session_id = Column(Integer, ForeignKey('sessions.id'), nullable=False)
+    session_id = Column(SessionID, ForeignKey('sessions.id'), nullable=False)
     source_url = Column(Text)
     title = Column(Text)
     content = Column(Text, nullable=False)
     relevance_score = Column(Float, default=0.0)
     credibility_score = Column(Float, default=0.0)
     timestamp = Column(DateTime, default=datetime.utcnow)
-    extra_metadata = Column(Text)  # JSON string for additional data
+    extra_metadata = Column(JSONText)  # JSON string for additional data
 
     # Relationships
     session = relationship("Session", back_populates="research_results")
@@ -66,7 +82,7 @@ class Keyword(Base):
     __tablename__ = 'keywords'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    session_id = Column(Integer, ForeignKey('sessions.id'), nullable=False)
+    session_id = Column(SessionID, ForeignKey('sessions.id'), nullable=False)
     keyword = Column(Text, nullable=False)
     keyword_type = Column(String(50), default='keyword')  # keyword, hashtag
     relevance_score = Column(Float, default=0.0)
@@ -80,10 +96,10 @@ class GeneratedContent(Base):
     __tablename__ = 'generated_content'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    session_id = Column(Integer, ForeignKey('sessions.id'), nullable=False)
+    session_id = Column(SessionID, ForeignKey('sessions.id'), nullable=False)
     content_type = Column(String(50), nullable=False)  # linkedin_post, voice_dialog
     content = Column(Text, nullable=False)
-    content_metadata = Column(Text)  # JSON string metadata (word count, tone, etc.)
+    content_metadata = Column(JSONText)  # JSON string metadata (word count, tone, etc.)
     quality_score = Column(Float, default=0.0)
     created_at = Column(DateTime, default=datetime.utcnow)
 
@@ -95,11 +111,11 @@ class AgentHandoff(Base):
     __tablename__ = 'agent_handoffs'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    session_id = Column(Integer, ForeignKey('sessions.id'), nullable=False)
+    session_id = Column(SessionID, ForeignKey('sessions.id'), nullable=False)
     from_agent = Column(String(100), nullable=False)
     to_agent = Column(String(100), nullable=False)
     action = Column(String(200), nullable=False)
-    payload = Column(Text)  # JSON string
+    payload = Column(JSONText)  # JSON string
     timestamp = Column(DateTime, default=datetime.utcnow)
     response_time_ms = Column(Integer)
 
@@ -9,17 +9,28 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import asyncio
+import json
+import string
 import sys
 import logging
-from typing import Optional
+from typing import Callable, Dict, Optional
 
 import click
 
 from agents.master_agent import MasterAgent
 from config.settings import config
-from database.connection import init_database
+from database.connection import init_database, close_database
 from services.logger import setup_logging
 from services.openrouter_client import OpenRouterClient
+from services.web_scraper import aclose_shared_session, shutdown_parse_pool
+
+# uvloop speeds up the HTTP- and DB-heavy pipeline; it is unavailable on Windows
+try:
+    import uvloop
+    _new_event_loop = uvloop.new_event_loop
+except ImportError:
+    uvloop = None
+    _new_event_loop = asyncio.new_event_loop
 
 @click.command()
 @click.argument('topic', required=True)
@@ -37,7 +48,19 @@ def main(
 
     TOPIC: The topic to process through the agent system
     """
-    asyncio.run(async_main(topic, verbose, session_id, output_format))
+    _run(async_main(topic, verbose, session_id, output_format))
+
+def _run(coro) -> None:
+    """Run a coroutine to completion on a fresh (uvloop when available) event loop."""
+    if hasattr(asyncio, "Runner"):
+        with asyncio.Runner(loop_factory=_new_event_loop) as runner:
+            runner.run(coro)
+        return
+
+    # Python < 3.11 has no loop_factory; fall back to the policy
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    asyncio.run(coro)
 
 
 async def get_perplexity_research(topic: str) -> str:
@@ -100,11 +123,7 @@ async def async_main(
             result = await master.process_topic_with_research(topic, research_response, session_id=session_id)
 
             # Output results
-            if output_format == 'json':
-                import json
-                click.echo(json.dumps(result, indent=2))
-            else:
-                display_results(result)
+            click.echo(_FORMATTERS[output_format](result))
 
             logger.info(f"Processing complete. Session ID: {result['session_id']}")
 
@@ -115,53 +134,64 @@ async def async_main(
             import traceback
             traceback.print_exc()
         sys.exit(1)
+    finally:
+        await close_database()
+        await aclose_shared_session()
+        shutdown_parse_pool()
 
-def display_results(result: dict) -> None:
-    """Display results in a user-friendly format."""
+_RULE = "=" * 60
+_DIVIDER = "-" * 40
 
-    click.echo("\n" + "="*60)
-    click.echo("🤖 AGENTIC SYSTEM RESULTS")
-    click.echo("="*60)
+# Fixed parts of the results report, built once at import
+_HEADER_TPL = string.Template(
+    f"\n{_RULE}\n🤖 AGENTIC SYSTEM RESULTS\n{_RULE}\n\n📋 Session ID: $session_id\n📝 Topic: $topic"
+)
+_BLOCK_TPL = string.Template(f"\n$title\n{_DIVIDER}\n$body\n{_DIVIDER}")
+_FOOTER = f"\n{_RULE}\n✅ Processing Complete!\n{_RULE}"
 
-    click.echo(f"\n📋 Session ID: {result['session_id']}")
-    click.echo(f"📝 Topic: {result['topic']}")
+def _fmt_json(result: dict) -> str:
+    """Render results as indented JSON."""
+    return json.dumps(result, indent=2)
+
+def _fmt_text(result: dict) -> str:
+    """Render results as a user-friendly report."""
+    parts = [_HEADER_TPL.substitute(session_id=result['session_id'], topic=result['topic'])]
 
     if 'analysis' in result:
-        click.echo("\n🔍 Topic Analysis:")
+        parts.append("\n🔍 Topic Analysis:")
         analysis = result['analysis']
         if isinstance(analysis, dict):
-            for key, value in analysis.items():
-                click.echo(f"  • {key.title()}: {value}")
+            parts.extend(f"  • {key.title()}: {value}" for key, value in analysis.items())
 
     if 'keywords' in result and result['keywords']:
-        click.echo("\n🏷️ Keywords:")
-        for keyword in result['keywords'][:10]:  # Show first 10
-            click.echo(f"  • {keyword}")
+        parts.append("\n🏷️ Keywords:")
+        parts.extend(f"  • {keyword}" for keyword in result['keywords'][:10])  # Show first 10
 
     if 'hashtags' in result and result['hashtags']:
-        click.echo("\n#️⃣ Hashtags:")
-        hashtags_str = " ".join(result['hashtags'][:10])  # Show first 10
-        click.echo(f"  {hashtags_str}")
+        parts.append("\n#️⃣ Hashtags:")
+        parts.append(f"  {' '.join(result['hashtags'][:10])}")  # Show first 10
 
     if 'linkedin_post' in result:
-        click.echo("\n💼 LinkedIn Post:")
-        click.echo("-" * 40)
-        click.echo(result['linkedin_post'])
-        click.echo("-" * 40)
+        parts.append(_BLOCK_TPL.substitute(title="💼 LinkedIn Post:", body=result['linkedin_post']))
 
     if 'voice_dialog' in result:
-        click.echo("\n🎙️ Voice Dialog Script:")
-        click.echo("-" * 40)
-        click.echo(result['voice_dialog'])
-        click.echo("-" * 40)
+        parts.append(_BLOCK_TPL.substitute(title="🎙️ Voice Dialog Script:", body=result['voice_dialog']))
 
     if 'research_summary' in result:
-        click.echo("\n📚 Research Summary:")
-        click.echo(result['research_summary'])
+        parts.extend(["\n📚 Research Summary:", result['research_summary']])
+
+    parts.append(_FOOTER)
+    return "\n".join(parts)
+
+_FORMATTERS: Dict[str, Callable[[dict], str]] = {
+    'json': _fmt_json,
+    'text': _fmt_text,
+}
 
-    click.echo("\n" + "="*60)
-    click.echo("✅ Processing Complete!")
-    click.echo("="*60)
+def display_results(result: dict) -> None:
+    """Display results in a user-friendly format."""
+    # One write for the whole report instead of a write and flush per line
+    click.echo(_fmt_text(result))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
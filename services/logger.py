@@ -1,5 +1,6 @@
 """Logging service for the agentic system."""
 
+import functools
 import logging
 import sys
 from pathlib import Path
@@ -71,8 +72,9 @@ def _setup_component_loggers() -> None:
     scrape_logger = logging.getLogger("scraper")
     scrape_logger.setLevel(logging.DEBUG)
 
+@functools.lru_cache(maxsize=None)
 def get_agent_logger(agent_name: str) -> logging.Logger:
-    """Get a logger specifically configured for an agent."""
+    """Get a logger specifically configured for an agent (cached per name)."""
 
     logger = logging.getLogger(f"agent.{agent_name}")
 
@@ -91,8 +93,9 @@ def get_agent_logger(agent_name: str) -> logging.Logger:
 
     return logger
 
+@functools.lru_cache(maxsize=None)
 def get_component_logger(component: str) -> logging.Logger:
-    """Get a logger for a specific system component."""
+    """Get a logger for a specific system component (cached per name)."""
 
     logger = logging.getLogger(f"system.{component}")
 
@@ -1,16 +1,101 @@
 """OpenRouter API client with retry logic and model management."""
 
 import aiohttp
+import functools
 import json
-from typing import Dict, Any, List, Optional
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Dict, Any, AsyncIterator, List, Mapping, Optional, Tuple
 import logging
 from datetime import datetime
 
 from config.settings import config
+from .sse import iter_sse_deltas
 from utils.retry import retry_with_backoff
 
 logger = logging.getLogger(__name__)
 
+# orjson decodes straight from bytes and encodes to bytes; stdlib json is the fallback
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+    _HAS_ORJSON = True
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+    _HAS_ORJSON = False
+
+@functools.lru_cache(maxsize=32)
+def _payload_template(
+    model: str,
+    tools_key: Optional[str],
+    temperature: Optional[float],
+    max_tokens: Optional[int],
+    top_p: Optional[float]
+) -> Mapping[str, Any]:
+    """Build the invariant part of a chat completion payload."""
+    payload: Dict[str, Any] = {"model": model}
+
+    # Add optional parameters
+    if temperature is not None:
+        payload["temperature"] = temperature
+    if max_tokens is not None:
+        payload["max_tokens"] = max_tokens
+    if top_p is not None:
+        payload["top_p"] = top_p
+
+    # Add tools if provided
+    if tools_key:
+        payload["tools"] = json.loads(tools_key)
+        payload["tool_choice"] = "auto"
+
+    return MappingProxyType(payload)
+
+@functools.lru_cache(maxsize=32)
+def _payload_prefix(
+    model: str,
+    tools_key: Optional[str],
+    temperature: Optional[float],
+    max_tokens: Optional[int],
+    top_p: Optional[float]
+) -> bytes:
+    """Encode the invariant payload once, left open for the per-request ``messages`` field."""
+    template = _payload_template(model, tools_key, temperature, max_tokens, top_p)
+    return _json_dumps(dict(template))[:-1] + b',"messages":'
+
+# Encoded tool lists keyed by list identity. Each entry holds its list (keeping the
+# list and its tool dicts alive, so their ids cannot be reused) and a shallow
+# fingerprint of the tool dicts, checked on every hit.
+_TOOLS_KEYS: "OrderedDict[int, Tuple[List[Dict[str, Any]], Tuple[int, ...], str]]" = OrderedDict()
+_TOOLS_KEYS_MAX = 32
+
+def _tools_key(tools: Optional[List[Dict[str, Any]]]) -> Optional[str]:
+    """Hashable form of a tool list for the payload caches, encoded once per list object.
+
+    Adding, removing or replacing tools in a reused list re-encodes it; editing a
+    tool dict in place is not detected, so swap in a new dict instead.
+    """
+    if not tools:
+        return None
+
+    fingerprint = tuple(map(id, tools))
+    entry = _TOOLS_KEYS.get(id(tools))
+    if entry is not None and entry[1] == fingerprint:
+        _TOOLS_KEYS.move_to_end(id(tools))
+        return entry[2]
+
+    key = json.dumps(tools)
+    _TOOLS_KEYS[id(tools)] = (tools, fingerprint, key)
+    _TOOLS_KEYS.move_to_end(id(tools))
+    if len(_TOOLS_KEYS) > _TOOLS_KEYS_MAX:
+        _TOOLS_KEYS.popitem(last=False)
+    return key
+
 class OpenRouterClient:
     """Client for OpenRouter API with retry logic and model management."""
 
@@ -19,26 +104,44 @@ class OpenRouterClient:
         self.base_url = "https://openrouter.ai/api/v1"
         self.session: Optional[aiohttp.ClientSession] = None
 
+        # Last model listing and its validators for conditional revalidation
+        self._models_cache: Optional[List[Dict[str, Any]]] = None
+        self._models_etag: Optional[str] = None
+        self._models_last_modified: Optional[str] = None
+
+    def _ensure_session(self) -> aiohttp.ClientSession:
+        """Return the client's pooled session, creating it on first use."""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=config.max_concurrent_requests,
+                keepalive_timeout=75
+            )
+            timeout = aiohttp.ClientTimeout(total=config.timeout_seconds)
+
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=timeout,
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json",
+                    "User-Agent": config.user_agent
+                }
+            )
+        return self.session
+
+    async def close(self) -> None:
+        """Close the pooled session, if one was opened."""
+        if self.session:
+            await self.session.close()
+            self.session = None
+
     async def __aenter__(self):
-        """Async context manager entry."""
-        connector = aiohttp.TCPConnector(limit=config.max_concurrent_requests)
-        timeout = aiohttp.ClientTimeout(total=config.timeout_seconds)
-
-        self.session = aiohttp.ClientSession(
-            connector=connector,
-            timeout=timeout,
-            headers={
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-                "User-Agent": config.user_agent
-            }
-        )
+        """Async context manager entry; the session is opened on first request."""
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit."""
-        if self.session:
-            await self.session.close()
+        await self.close()
 
     @retry_with_backoff(max_retries=config.max_retries)
     async def chat_completion(
@@ -64,66 +167,106 @@ class OpenRouterClient:
             API response dictionary
         """
 
-        if not self.session:
-            raise RuntimeError("Client session not initialized. Use async context manager.")
-
+        session = self._ensure_session()
         start_time = datetime.utcnow()
 
-        # Build request payload for OpenRouter (handles all models including perplexity/sonar)
-        payload = {
-            "model": model,
-            "messages": messages
-        }
-
-        # Add optional parameters
-        if temperature is not None:
-            payload["temperature"] = temperature
-        if max_tokens is not None:
-            payload["max_tokens"] = max_tokens
-        if top_p is not None:
-            payload["top_p"] = top_p
+        # Build request body for OpenRouter (handles all models including perplexity/sonar);
+        # only the messages are encoded per call
+        prefix = _payload_prefix(model, _tools_key(tools), temperature, max_tokens, top_p)
+        body = prefix + _json_dumps(messages) + b"}"
 
-        # Add tools if provided
-        if tools:
-            payload["tools"] = tools
-            payload["tool_choice"] = "auto"
-
-        logger.debug(f"Sending request to {model} with {len(messages)} messages")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Sending request to %s with %d messages", model, len(messages))
 
         try:
-            async with self.session.post(
+            async with session.post(
                 f"{self.base_url}/chat/completions",
-                json=payload
+                data=body
             ) as response:
                 response.raise_for_status()
-                result = await response.json()
+                result = _json_loads(await response.read())
 
-                duration = (datetime.utcnow() - start_time).total_seconds() * 1000
-                logger.info(
-                    f"OpenRouter API call completed in {duration:.2f}ms "
-                    f"(model: {model}, tokens: {result.get('usage', {}).get('total_tokens', 'N/A')})"
-                )
+                if logger.isEnabledFor(logging.INFO):
+                    duration = (datetime.utcnow() - start_time).total_seconds() * 1000
+                    logger.info(
+                        "OpenRouter API call completed in %.2fms (model: %s, tokens: %s)",
+                        duration, model, result.get('usage', {}).get('total_tokens', 'N/A')
+                    )
 
                 return result
 
         except aiohttp.ClientError as e:
             duration = (datetime.utcnow() - start_time).total_seconds() * 1000
-            logger.error(
-                f"OpenRouter API call failed after {duration:.2f}ms: {e}"
-            )
+            logger.error("OpenRouter API call failed after %.2fms: %s", duration, e)
             raise
 
+    async def chat_completion_stream(
+        self,
+        model: str,
+        messages: List[Dict[str, Any]],
+        tools: Optional[List[Dict[str, Any]]] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        top_p: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        """Stream a chat completion, yielding content deltas as they arrive.
+
+        Takes the same arguments as ``chat_completion``. Not retried: a
+        partially consumed stream cannot be replayed.
+        """
+        session = self._ensure_session()
+
+        prefix = _payload_prefix(model, _tools_key(tools), temperature, max_tokens, top_p)
+        body = prefix + _json_dumps(messages) + b',"stream":true}'
+
+        async with session.post(
+            f"{self.base_url}/chat/completions",
+            data=body
+        ) as response:
+            response.raise_for_status()
 
+            async for content in iter_sse_deltas(response):
+                yield content
+
+    def prepare_payload(
+        self,
+        model: str,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        top_p: Optional[float] = None
+    ) -> Mapping[str, Any]:
+        """Get the cached, read-only payload skeleton for a request configuration.
+
+        Only ``messages`` varies per request; bind it with
+        ``{**template, "messages": messages}``.
+        """
+        return _payload_template(model, _tools_key(tools), temperature, max_tokens, top_p)
 
     async def list_models(self) -> List[Dict[str, Any]]:
         """List available models from OpenRouter."""
-        if not self.session:
-            raise RuntimeError("Client session not initialized. Use async context manager.")
+        session = self._ensure_session()
+
+        # Revalidate a previous listing so an unchanged list comes back as 304
+        headers = {}
+        if self._models_cache is not None:
+            if self._models_etag:
+                headers["If-None-Match"] = self._models_etag
+            if self._models_last_modified:
+                headers["If-Modified-Since"] = self._models_last_modified
+
+        async with session.get(f"{self.base_url}/models", headers=headers) as response:
+            if response.status == 304 and self._models_cache is not None:
+                logger.debug("Model list not modified, using cached listing")
+                return self._models_cache
 
-        async with self.session.get(f"{self.base_url}/models") as response:
             response.raise_for_status()
-            data = await response.json()
-            return data.get("data", [])
+            data = _json_loads(await response.read())
+
+            self._models_cache = data.get("data", [])
+            self._models_etag = response.headers.get("ETag")
+            self._models_last_modified = response.headers.get("Last-Modified")
+            return self._models_cache
 
     def extract_response_content(self, response: Dict[str, Any]) -> str:
         """Extract content from OpenRouter API response."""
@@ -136,8 +279,7 @@ class OpenRouterClient:
     def extract_tool_calls(self, response: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Extract tool calls from OpenRouter API response."""
         try:
-            message = response["choices"][0]["message"]
-            return message.get("tool_calls", [])
+            return response["choices"][0]["message"].get("tool_calls", [])
         except (KeyError, IndexError) as e:
             logger.error(f"Failed to extract tool calls from response: {e}")
             return []
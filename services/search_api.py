@@ -1,14 +1,42 @@
 """Search API integrations."""
 
 import asyncio
+import json
 import logging
+import re
 from typing import Dict, Any, List, Optional
-import json
+from urllib.parse import quote, urlsplit, urlunsplit
+
+import aiohttp
 
 from config.settings import config
+from .sse import iter_sse_deltas
 
 logger = logging.getLogger(__name__)
 
+# DuckDuckGo HTML result anchors: captures (href, title)
+_DUCKDUCKGO_RESULT_RE = re.compile(
+    r'<a[^>]*class="[^"]*result__a[^"]*"[^>]*href="([^"]*)"[^>]*>([^<]*)</a>',
+    re.IGNORECASE
+)
+_DUCKDUCKGO_SNIPPET = "Result from DuckDuckGo search for: {}"
+_GOOGLE_MAX_RESULT = 100
+
+def _canonical_url(url: str) -> str:
+    """Normalize a URL so the same page from different sources compares equal."""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        # Malformed hits (e.g. a broken IPv6 host) still dedupe on their raw text
+        return url.strip().lower()
+    return urlunsplit((
+        parts.scheme.lower() or "https",
+        parts.netloc.lower(),
+        parts.path.rstrip("/") or "/",
+        parts.query,
+        ""
+    ))
+
 class SearchAPI:
     """Search API integrations for web research."""
 
@@ -28,55 +56,92 @@ class SearchAPI:
         if self.perplexity_api_key and self.perplexity_api_key.startswith("your_"):
             self.perplexity_api_key = None
 
+        # Credentials are fixed after construction, so resolve the enabled
+        # backends once instead of re-checking them on every search
+        self._source_dispatch = {}
+        if self.perplexity_api_key:
+            self._source_dispatch["perplexity"] = self.search_perplexity
+        if self.google_api_key and self.google_cse_id:
+            self._source_dispatch["google"] = self.search_google
+        if self.bing_api_key:
+            self._source_dispatch["bing"] = self.search_bing
+        self._source_dispatch["duckduckgo"] = self.search_duckduckgo
+
     async def search_google(self, query: str, num_results: int = 10, **kwargs) -> List[Dict[str, Any]]:
-        """Search using Google Custom Search API."""
+        """Search using Google Custom Search API.
+
+        Google returns at most 10 results per request, so larger requests are
+        split into pages that are fetched concurrently on one session.
+        """
         if not self.google_api_key or not self.google_cse_id:
             logger.warning("Google API credentials not configured")
             return []
 
         try:
-            import aiohttp
-
-            base_url = "https://www.googleapis.com/customsearch/v1"
-            params = {
-                "key": self.google_api_key,
-                "cx": self.google_cse_id,
-                "q": query,
-                "num": min(num_results, 10),  # Google limits to 10 per request
-                "start": kwargs.get("start", 1)
-            }
-
-            # Add optional parameters
-            if "date_restrict" in kwargs:
-                params["dateRestrict"] = kwargs["date_restrict"]
-            if "site_search" in kwargs:
-                params["siteSearch"] = kwargs["site_search"]
+            first = kwargs.pop("start", 1)
+            pages = []
+            for offset in range(0, max(num_results, 1), 10):
+                start = first + offset
+                # Google CSE serves results 1-100 only; later pages are rejected
+                num = min(10, num_results - offset, _GOOGLE_MAX_RESULT - start + 1)
+                if num <= 0:
+                    break
+                pages.append((start, num))
 
             async with aiohttp.ClientSession() as session:
-                async with session.get(base_url, params=params) as response:
-                    response.raise_for_status()
-                    data = await response.json()
-
-                    results = []
-                    if "items" in data:
-                        for item in data["items"]:
-                            results.append({
-                                "title": item.get("title", ""),
-                                "url": item.get("link", ""),
-                                "snippet": item.get("snippet", ""),
-                                "source": "google",
-                                "query": query
-                            })
+                page_results = await asyncio.gather(*[
+                    self._google_page(session, query, start, num, **kwargs)
+                    for start, num in pages
+                ])
 
-                    return results
+            return [result for page in page_results for result in page]
 
-        except ImportError:
-            logger.warning("aiohttp not available for Google search")
-            return []
         except Exception as e:
             logger.error(f"Google search error: {e}")
             return []
 
+    async def _google_page(
+        self,
+        session: aiohttp.ClientSession,
+        query: str,
+        start: int,
+        num: int,
+        **kwargs
+    ) -> List[Dict[str, Any]]:
+        """Fetch a single page (up to 10 results) from Google Custom Search."""
+        base_url = "https://www.googleapis.com/customsearch/v1"
+        params = {
+            "key": self.google_api_key,
+            "cx": self.google_cse_id,
+            "q": query,
+            "num": num,
+            "start": start
+        }
+
+        # Add optional parameters
+        if "date_restrict" in kwargs:
+            params["dateRestrict"] = kwargs["date_restrict"]
+        if "site_search" in kwargs:
+            params["siteSearch"] = kwargs["site_search"]
+
+        async with session.get(base_url, params=params) as response:
+            data = await self._read_json(response, "google")
+            if data is None:
+                return []
+
+            results = []
+            if "items" in data:
+                for item in data["items"]:
+                    results.append({
+                        "title": item.get("title", ""),
+                        "url": item.get("link", ""),
+                        "snippet": item.get("snippet", ""),
+                        "source": "google",
+                        "query": query
+                    })
+
+            return results
+
     async def search_bing(self, query: str, num_results: int = 10, **kwargs) -> List[Dict[str, Any]]:
         """Search using Bing Search API."""
         if not self.bing_api_key:
@@ -84,8 +149,6 @@ class SearchAPI:
             return []
 
         try:
-            import aiohttp
-
             base_url = "https://api.bing.microsoft.com/v7.0/search"
             headers = {
                 "Ocp-Apim-Subscription-Key": self.bing_api_key
@@ -103,8 +166,9 @@ class SearchAPI:
 
             async with aiohttp.ClientSession(headers=headers) as session:
                 async with session.get(base_url, params=params) as response:
-                    response.raise_for_status()
-                    data = await response.json()
+                    data = await self._read_json(response, "bing")
+                    if data is None:
+                        return []
 
                     results = []
                     if "webPages" in data and "value" in data["webPages"]:
@@ -119,19 +183,27 @@ class SearchAPI:
 
                     return results
 
-        except ImportError:
-            logger.warning("aiohttp not available for Bing search")
-            return []
         except Exception as e:
             logger.error(f"Bing search error: {e}")
             return []
 
+    async def _read_json(self, response: aiohttp.ClientResponse, source: str) -> Optional[Dict[str, Any]]:
+        """Decode a JSON API response, or return None for error/non-JSON bodies.
+
+        Quota and auth failures are often served as HTML pages; those are
+        logged with a short excerpt instead of being run through the JSON
+        decoder.
+        """
+        if response.status != 200 or "json" not in (response.content_type or ""):
+            body = (await response.text())[:200]
+            logger.error("Non-JSON %s response from %s: %s", response.status, source, body)
+            return None
+
+        return json.loads(await response.read())
+
     async def search_duckduckgo(self, query: str, num_results: int = 10, **kwargs) -> List[Dict[str, Any]]:
         """Search using DuckDuckGo (no API key required)."""
         try:
-            import aiohttp
-            from urllib.parse import quote
-
             # DuckDuckGo doesn't have an official API, so we'll use their HTML interface
             # This is a simplified implementation
             search_url = f"https://duckduckgo.com/html/?q={quote(query)}"
@@ -145,9 +217,6 @@ class SearchAPI:
                     results = self._parse_duckduckgo_html(html_content, query, num_results)
                     return results
 
-        except ImportError:
-            logger.warning("aiohttp not available for DuckDuckGo search")
-            return []
         except Exception as e:
             logger.error(f"DuckDuckGo search error: {e}")
             return []
@@ -160,22 +229,22 @@ class SearchAPI:
             # This is a very basic implementation
             # In production, you'd want to use proper HTML parsing
 
-            # Look for result patterns in HTML
-            import re
-
             # Find result links and titles
-            result_pattern = r'<a[^>]*class="[^"]*result__a[^"]*"[^>]*href="([^"]*)"[^>]*>([^<]*)</a>'
-            matches = re.findall(result_pattern, html, re.IGNORECASE)
-
-            for url, title in matches[:num_results]:
-                if url and title:
-                    results.append({
-                        "title": title.strip(),
-                        "url": url,
-                        "snippet": f"Result from DuckDuckGo search for: {query}",
-                        "source": "duckduckgo",
-                        "query": query
-                    })
+            matches = _DUCKDUCKGO_RESULT_RE.findall(html)
+
+            # The snippet is identical for every row, so build it once
+            snippet = _DUCKDUCKGO_SNIPPET.format(query)
+            results = [
+                {
+                    "title": title.strip(),
+                    "url": url,
+                    "snippet": snippet,
+                    "source": "duckduckgo",
+                    "query": query
+                }
+                for url, title in matches[:num_results]
+                if url and title
+            ]
 
         except Exception as e:
             logger.error(f"Error parsing DuckDuckGo results: {e}")
@@ -189,8 +258,6 @@ class SearchAPI:
             return []
 
         try:
-            import aiohttp
-
             url = "https://api.perplexity.ai/chat/completions"
             headers = {
                 "Authorization": f"Bearer {self.perplexity_api_key}",
@@ -207,15 +274,16 @@ class SearchAPI:
                     }
                 ],
                 "max_tokens": 1500,
-                "temperature": 0.1
+                "temperature": 0.1,
+                "stream": True
             }
 
             async with aiohttp.ClientSession() as session:
                 async with session.post(url, json=payload, headers=headers) as response:
                     response.raise_for_status()
-                    data = await response.json()
 
-                    content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
+                    # Assemble the answer from SSE deltas as they arrive
+                    content = await self._read_perplexity_stream(response)
 
                     # For Perplexity, return the response as a single comprehensive result
                     if content:
@@ -230,13 +298,13 @@ class SearchAPI:
                     else:
                         return []
 
-        except ImportError:
-            logger.warning("aiohttp not available for Perplexity search")
-            return []
         except Exception as e:
             logger.error(f"Perplexity search error: {e}")
             return []
 
+    async def _read_perplexity_stream(self, response: aiohttp.ClientResponse) -> str:
+        """Concatenate content deltas from a streamed (SSE) chat completion."""
+        return "".join([content async for content in iter_sse_deltas(response)])
 
     async def search_multiple_sources(
         self,
@@ -246,25 +314,14 @@ class SearchAPI:
         **kwargs
     ) -> Dict[str, List[Dict[str, Any]]]:
         """Search multiple sources concurrently."""
-        if sources is None:
-            sources = ["perplexity", "google", "bing", "duckduckgo"]
-
-        # Create search tasks
-        tasks = []
+        # Create search tasks for the enabled backends that were requested
+        tasks = [
+            (source, search(query, num_results, **kwargs))
+            for source, search in self._source_dispatch.items()
+            if sources is None or source in sources
+        ]
         results = {}
 
-        if "perplexity" in sources and self.perplexity_api_key:
-            tasks.append(("perplexity", self.search_perplexity(query, num_results, **kwargs)))
-
-        if "google" in sources and self.google_api_key and self.google_cse_id:
-            tasks.append(("google", self.search_google(query, num_results, **kwargs)))
-
-        if "bing" in sources and self.bing_api_key:
-            tasks.append(("bing", self.search_bing(query, num_results, **kwargs)))
-
-        if "duckduckgo" in sources:
-            tasks.append(("duckduckgo", self.search_duckduckgo(query, num_results, **kwargs)))
-
         # Execute searches concurrently
         if tasks:
             search_results = await asyncio.gather(*[task for _, task in tasks], return_exceptions=True)
@@ -280,25 +337,22 @@ class SearchAPI:
 
     def combine_results(self, search_results: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
         """Combine and deduplicate results from multiple sources."""
-        all_results = []
-        seen_urls = set()
+        combined: Dict[str, Dict[str, Any]] = {}
 
-        # Collect all results
+        # Collect all results, merging sources for the same canonical URL
         for source, results in search_results.items():
             for result in results:
-                url = result.get("url", "").lower()
-                if url and url not in seen_urls:
+                url = result.get("url", "")
+                if not url:
+                    continue
+
+                existing = combined.setdefault(_canonical_url(url), result)
+                if existing is result:
                     result["search_sources"] = [source]
-                    all_results.append(result)
-                    seen_urls.add(url)
-                elif url in seen_urls:
-                    # URL already seen, add source to existing result
-                    for existing_result in all_results:
-                        if existing_result.get("url", "").lower() == url:
-                            if "search_sources" not in existing_result:
-                                existing_result["search_sources"] = []
-                            existing_result["search_sources"].append(source)
-                            break
+                else:
+                    existing.setdefault("search_sources", []).append(source)
+
+        all_results = list(combined.values())
 
         # Sort by relevance (simple implementation)
         # In production, you'd want more sophisticated ranking
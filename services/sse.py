@@ -0,0 +1,44 @@
+"""Server-sent event (SSE) parsing for streamed chat completions."""
+
+import json
+import logging
+from typing import AsyncIterator
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# orjson decodes straight from bytes; stdlib json is the fallback
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+async def iter_sse_deltas(response: aiohttp.ClientResponse) -> AsyncIterator[str]:
+    """Yield the content deltas of a streamed chat completion until ``[DONE]``.
+
+    Blank separators, comments such as ``: keep-alive`` and malformed frames
+    are skipped. Frames carrying a full ``message`` instead of a ``delta`` are
+    accepted too.
+    """
+    async for raw_line in response.content:
+        line = raw_line.strip()
+        if not line.startswith(b"data:"):
+            continue
+
+        data = line[5:].strip()
+        if data == b"[DONE]":
+            break
+
+        try:
+            chunk = _json_loads(data)
+        except ValueError:
+            logger.debug("Skipping malformed stream frame")
+            continue
+
+        choices = chunk.get("choices") or [{}]
+        delta = choices[0].get("delta") or choices[0].get("message") or {}
+        content = delta.get("content")
+        if content:
+            yield content
@@ -1,77 +1,601 @@
 """Web scraping utilities."""
 
 import asyncio
+import copy
+import functools
 import logging
-from typing import Dict, Any, List, Optional
-from urllib.parse import urlparse, urljoin
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Union, AsyncIterator, Callable
+from urllib.parse import urlparse, urljoin, parse_qs, urlencode
 import re
 
+import aiohttp
+
 from config.settings import config
 
 logger = logging.getLogger(__name__)
 
+try:
+    from bs4 import BeautifulSoup, SoupStrainer
+    _HAS_BS4 = True
+except ImportError:
+    BeautifulSoup = SoupStrainer = None
+    _HAS_BS4 = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    _HAS_SELECTOLAX = True
+except ImportError:
+    LexborHTMLParser = None
+    _HAS_SELECTOLAX = False
+
+# Prefer the C-based lxml tree builder; html.parser is the pure-Python fallback
+try:
+    import lxml  # noqa: F401
+    _HTML_PARSER = "lxml"
+except ImportError:
+    _HTML_PARSER = "html.parser"
+
+# aiohttp decodes Brotli responses only when a Brotli binding is installed
+try:
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        import brotlicffi  # noqa: F401
+    _ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    _ACCEPT_ENCODING = "gzip, deflate"
+
+# Common main-content containers, tried in order. These are plain
+# tag/attribute/class lookups, so find() is used instead of compiling the
+# equivalent CSS selectors (main, [role="main"], .content, ...).
+_CONTENT_LOOKUPS = (
+    {'name': 'main'},
+    {'attrs': {'role': 'main'}},
+    {'class_': 'content'},
+    {'class_': 'post-content'},
+    {'class_': 'entry-content'},
+    {'name': 'article'},
+    {'class_': 'article-content'},
+)
+
+# The same containers as CSS selectors, for the selectolax fast path
+_CONTENT_SELECTORS = (
+    'main', '[role="main"]', '.content', '.post-content', '.entry-content', 'article', '.article-content'
+)
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_HTML_LANG_RE = re.compile(r'<html\b[^>]*?\slang\s*=\s*["\']?([^"\'\s>]+)', re.IGNORECASE)
+_HTML_LANG_BYTES_RE = re.compile(_HTML_LANG_RE.pattern.encode(), re.IGNORECASE)
+_HEAD_END_RE = re.compile(rb'</head\s*>', re.IGNORECASE)
+
+def _extract_html_lang(html_content: Union[str, bytes]) -> str:
+    """Get the lang attribute of the document's <html> tag."""
+    if isinstance(html_content, bytes):
+        match = _HTML_LANG_BYTES_RE.search(html_content)
+        return match.group(1).decode('ascii', errors='replace') if match else ""
+    match = _HTML_LANG_RE.search(html_content)
+    return match.group(1) if match else ""
+
+def _decode(content: Union[str, bytes], encoding: Optional[str] = None) -> str:
+    """Decode a raw response body, defaulting to UTF-8 when no charset is known."""
+    if isinstance(content, bytes):
+        return content.decode(encoding or 'utf-8', errors='replace')
+    return content
+
+# Response headers kept in metadata results; the rest (cookies, links, ...) are dropped
+_KEPT_HEADERS = frozenset({
+    'content-type', 'content-length', 'last-modified', 'etag', 'server', 'content-language'
+})
+
+async def _read_head(stream: aiohttp.StreamReader, chunk_size: int = 65536) -> bytes:
+    """Read a response body only up to its closing </head> tag."""
+    buffer = bytearray()
+    async for chunk in stream.iter_chunked(chunk_size):
+        # Rescan a few bytes before the new chunk in case the tag straddles chunks
+        start = max(0, len(buffer) - 8)
+        buffer += chunk
+        match = _HEAD_END_RE.search(buffer, start)
+        if match:
+            return bytes(buffer[:match.end()])
+    return bytes(buffer)
+
+def _kept_headers(headers: Dict[str, str]) -> Dict[str, str]:
+    """Copy only the headers listed in _KEPT_HEADERS."""
+    return {k: v for k, v in headers.items() if k.lower() in _KEPT_HEADERS}
+
+# Common tracking parameters stripped by clean_url
+_TRACKING_PARAMS = frozenset({
+    'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content',
+    'fbclid', 'gclid', 'msclkid', '_ga', '_gl'
+})
+
+@functools.lru_cache(maxsize=4096)
+def _clean_url(url: str) -> str:
+    """Strip tracking parameters from a URL (memoized; pages repeat links)."""
+    # Nothing to strip without a query string
+    if '?' not in url:
+        return url
+
+    try:
+        parsed = urlparse(url)
+        query = ''
+        if parsed.query:
+            params = {
+                key: values
+                for key, values in parse_qs(parsed.query).items()
+                if key not in _TRACKING_PARAMS
+            }
+            if params:
+                query = urlencode(params, doseq=True)
+
+        # Reconstruct URL
+        return parsed._replace(query=query).geturl()
+    except Exception:
+        return url
+
+@functools.lru_cache(maxsize=2048)
+def _is_valid_url(url: str) -> bool:
+    """Check that a URL has a scheme and a network location (memoized)."""
+    # A netloc is only parsed after "scheme://", so skip urlparse without one
+    if '://' not in url:
+        return False
+
+    try:
+        parsed = urlparse(url)
+        return bool(parsed.scheme and parsed.netloc)
+    except Exception:
+        return False
+
+# Process-wide session reused across WebScraper instances
+_shared_session: Optional[aiohttp.ClientSession] = None
+_shared_session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def _create_session() -> aiohttp.ClientSession:
+    """Create a scraping session with pooled connections and browser-like headers."""
+    max_concurrent = config.max_concurrent_requests
+    connector = aiohttp.TCPConnector(
+        limit=max_concurrent,
+        limit_per_host=min(max_concurrent, 8)
+    )
+    timeout = aiohttp.ClientTimeout(total=30)
+
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=timeout,
+        # Error statuses raise inside aiohttp, so scrape_url needs no per-response check
+        raise_for_status=True,
+        headers={
+            "User-Agent": config.user_agent,
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+            "Accept-Language": "en-US,en;q=0.5",
+            "Accept-Encoding": _ACCEPT_ENCODING,
+            "Connection": "keep-alive",
+            "Upgrade-Insecure-Requests": "1",
+        }
+    )
+
+async def get_session() -> aiohttp.ClientSession:
+    """Get the shared scraping session, creating it on first use.
+
+    A session is bound to the event loop it was created on, so a new one is
+    created if the previous session was closed or belongs to another loop;
+    a session left behind on another loop is closed before it is replaced.
+    """
+    global _shared_session, _shared_session_loop
+
+    loop = asyncio.get_running_loop()
+    if _shared_session is None or _shared_session.closed or _shared_session_loop is not loop:
+        stale, stale_loop = _shared_session, _shared_session_loop
+        _shared_session = _create_session()
+        _shared_session_loop = loop
+
+        if stale is not None and not stale.closed:
+            if stale_loop is not None and stale_loop.is_running():
+                # Still serving another thread; close it there
+                asyncio.run_coroutine_threadsafe(stale.close(), stale_loop)
+            else:
+                await stale.close()
+
+    return _shared_session
+
+async def aclose_shared_session() -> None:
+    """Close the shared scraping session (call on application shutdown)."""
+    global _shared_session, _shared_session_loop
+
+    if _shared_session is not None and not _shared_session.closed:
+        await _shared_session.close()
+    _shared_session = None
+    _shared_session_loop = None
+
+def _anchor_text(a_tag) -> str:
+    """Return an anchor's text, avoiding a subtree walk for plain-text anchors."""
+    string = a_tag.string
+    if string is not None:
+        return string.strip()
+    return a_tag.get_text().strip()
+
+def _extract_text_content_fast(
+    html_content: Union[str, bytes], url: str, encoding: Optional[str] = None
+) -> Dict[str, Any]:
+    """Extract readable text content from HTML with selectolax's C parser."""
+    tree = LexborHTMLParser(_decode(html_content, encoding) if encoding else html_content)
+    tree.strip_tags(["script", "style"])
+
+    title = title_node.text().strip() if (title_node := tree.css_first('title')) else ""
+
+    description = ""
+    if meta_desc := tree.css_first('meta[name="description"]'):
+        description = (meta_desc.attributes.get('content') or '').strip()
+
+    main_content = ""
+    for selector in _CONTENT_SELECTORS:
+        if content_node := tree.css_first(selector):
+            main_content = content_node.text(separator=' ', strip=True)
+            break
+
+    if not main_content and tree.body:
+        main_content = tree.body.text(separator=' ', strip=True)
+
+    main_content = _WHITESPACE_RE.sub(' ', main_content).strip()
+
+    return {
+        "url": url,
+        "title": title,
+        "description": description,
+        "content": main_content,
+        "word_count": len(main_content.split()),
+        "success": True
+    }
+
+def _extract_text_content(
+    html_content: Union[str, bytes], url: str, encoding: Optional[str] = None
+) -> Dict[str, Any]:
+    """Extract readable text content from HTML."""
+    if config.fast_parser and _HAS_SELECTOLAX:
+        try:
+            return _extract_text_content_fast(html_content, url, encoding)
+        except Exception as e:
+            # Fall back to BeautifulSoup, which is more forgiving of malformed input
+            logger.debug(f"Fast parser failed for {url}, falling back to BeautifulSoup: {e}")
+
+    if not _HAS_BS4:
+        logger.warning("BeautifulSoup not available, returning raw content")
+        return {
+            "url": url,
+            "content": _decode(html_content, encoding),
+            "success": True,
+            "note": "BeautifulSoup not available for parsing"
+        }
+
+    try:
+        soup = BeautifulSoup(html_content, _HTML_PARSER, from_encoding=encoding)
+
+        # Remove script and style elements
+        for script in soup(["script", "style"]):
+            script.decompose()
+
+        # Extract title
+        title = ""
+        if title_tag := soup.find('title'):
+            title = title_tag.get_text().strip()
+
+        # Extract meta description
+        description = ""
+        if meta_desc := soup.find('meta', attrs={'name': 'description'}):
+            description = meta_desc.get('content', '').strip()
+
+        # Extract main content
+        main_content = ""
+        for lookup in _CONTENT_LOOKUPS:
+            if content_elem := soup.find(**lookup):
+                main_content = content_elem.get_text(separator=' ', strip=True)
+                break
+
+        # Fallback to body text if no main content found
+        if not main_content:
+            if body := soup.find('body'):
+                main_content = body.get_text(separator=' ', strip=True)
+
+        # Clean up whitespace
+        main_content = _WHITESPACE_RE.sub(' ', main_content).strip()
+
+        return {
+            "url": url,
+            "title": title,
+            "description": description,
+            "content": main_content,
+            "word_count": len(main_content.split()),
+            "success": True
+        }
+
+    except Exception as e:
+        logger.error(f"Error extracting text content: {e}")
+        return {
+            "url": url,
+            "error": str(e),
+            "success": False
+        }
+
+def _extract_links(
+    html_content: Union[str, bytes], base_url: str, encoding: Optional[str] = None
+) -> Dict[str, Any]:
+    """Extract links from HTML content."""
+    if not _HAS_BS4:
+        logger.warning("BeautifulSoup not available for link extraction")
+        return {
+            "url": base_url,
+            "links": [],
+            "success": True,
+            "note": "BeautifulSoup not available for parsing"
+        }
+
+    try:
+        # Only anchors with an href are ever read, so skip building the rest
+        soup = BeautifulSoup(
+            html_content, _HTML_PARSER, parse_only=SoupStrainer('a', href=True), from_encoding=encoding
+        )
+        links = [
+            {
+                # Convert relative URLs to absolute
+                "url": href if href.startswith(('http://', 'https://')) else urljoin(base_url, href),
+                "text": _anchor_text(a_tag),
+                "title": a_tag.get('title', '')
+            }
+            for a_tag in soup.find_all('a')
+            for href in (a_tag['href'],)
+        ]
+
+        return {
+            "url": base_url,
+            "links": links,
+            "link_count": len(links),
+            "success": True
+        }
+
+    except Exception as e:
+        logger.error(f"Error extracting links: {e}")
+        return {
+            "url": base_url,
+            "error": str(e),
+            "success": False
+        }
+
+def _extract_metadata(
+    html_content: Union[str, bytes], url: str, headers: Dict[str, str], encoding: Optional[str] = None
+) -> Dict[str, Any]:
+    """Extract metadata from HTML and headers."""
+    if not _HAS_BS4:
+        logger.warning("BeautifulSoup not available for metadata extraction")
+        return {
+            "url": url,
+            "headers": _kept_headers(headers),
+            "success": True,
+            "note": "BeautifulSoup not available for parsing"
+        }
+
+    try:
+        # Only <meta> and <title> are read from the tree. <html> is left
+        # out of the strainer because matching it would keep the whole
+        # document; its lang attribute is read from the raw markup instead.
+        soup = BeautifulSoup(
+            html_content, _HTML_PARSER, parse_only=SoupStrainer(['meta', 'title']), from_encoding=encoding
+        )
+        metadata = {
+            "url": url,
+            "headers": _kept_headers(headers),
+            "meta_tags": {},
+            "open_graph": {},
+            "twitter_cards": {}
+        }
+
+        meta_tags = metadata["meta_tags"]
+        open_graph = metadata["open_graph"]
+        twitter_cards = metadata["twitter_cards"]
+
+        # Extract meta tags, reading each tag's attribute dict directly
+        for meta in soup.find_all('meta'):
+            attrs = meta.attrs
+            name = attrs.get('name') or attrs.get('property') or attrs.get('http-equiv')
+            content = attrs.get('content')
+            if name and content:
+                meta_tags[name] = content
+
+                # Categorize Open Graph and Twitter Card tags (mutually exclusive)
+                if name.startswith('og:'):
+                    open_graph[name[3:]] = content
+                elif name.startswith('twitter:'):
+                    twitter_cards[name[8:]] = content
+
+        # Extract additional metadata
+        metadata.update({
+            "title": title_tag.get_text().strip() if (title_tag := soup.find('title')) else "",
+            "language": _extract_html_lang(html_content),
+            "success": True
+        })
+
+        return metadata
+
+    except Exception as e:
+        logger.error(f"Error extracting metadata: {e}")
+        return {
+            "url": url,
+            "error": str(e),
+            "success": False
+        }
+
+def _parse_document(
+    extract_type: str,
+    html_content: Union[str, bytes],
+    url: str,
+    encoding: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None
+) -> Dict[str, Any]:
+    """Run the extractor for extract_type (module level so worker processes can pickle it)."""
+    if extract_type == "text":
+        return _extract_text_content(html_content, url, encoding)
+    elif extract_type == "links":
+        return _extract_links(html_content, url, encoding)
+    else:
+        return _extract_metadata(html_content, url, headers or {}, encoding)
+
+# Parsing is CPU-bound and would block the event loop, so large documents are
+# parsed in worker processes. Below this size the IPC round trip costs more
+# than parsing inline.
+_OFFLOAD_MIN_BYTES = 256 * 1024
+
+_parse_pool: Optional[ProcessPoolExecutor] = None
+
+def _get_parse_pool() -> ProcessPoolExecutor:
+    """Get the shared parsing process pool, creating it on first use."""
+    global _parse_pool
+
+    if _parse_pool is None:
+        _parse_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+    return _parse_pool
+
+def shutdown_parse_pool() -> None:
+    """Shut down the parse worker pool, cancelling queued parses (call on application shutdown)."""
+    global _parse_pool
+
+    if _parse_pool is not None:
+        _parse_pool.shutdown(wait=False, cancel_futures=True)
+        _parse_pool = None
+
+async def _run_parser(
+    extract_type: str,
+    html_content: bytes,
+    url: str,
+    encoding: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None
+) -> Dict[str, Any]:
+    """Parse a document inline, or in the process pool when it is large."""
+    if len(html_content) < _OFFLOAD_MIN_BYTES:
+        return _parse_document(extract_type, html_content, url, encoding, headers)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_parse_pool(), _parse_document, extract_type, html_content, url, encoding, headers
+    )
+
 class WebScraper:
-    """Web scraping utilities for research purposes."""
+    """Web scraping utilities for research purposes.
 
-    def __init__(self):
+    By default all instances share one connection pool so repeated scrapes
+    reuse open TCP/TLS connections. Pass ``shared=False`` for an isolated
+    session (e.g. separate cookies) that is closed on context exit.
+    """
+
+    def __init__(self, shared: bool = True):
         self.session = None
+        self.shared = shared
         self.user_agent = config.user_agent
         self.request_delay = config.request_delay
         self.max_concurrent = config.max_concurrent_requests
+        self.metadata_head_only = config.metadata_head_only
+
+        # Per-host politeness: requests to one host are spaced by
+        # request_delay while different hosts proceed in parallel
+        self._host_last_hit: Dict[str, float] = {}
+        self._host_locks: Dict[str, asyncio.Lock] = {}
+
+        # LRU cache of successful results keyed on (cleaned URL, extract type)
+        self._cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._cache_max = 512
 
     async def __aenter__(self):
         """Async context manager entry."""
-        import aiohttp
-        connector = aiohttp.TCPConnector(limit=self.max_concurrent)
-        timeout = aiohttp.ClientTimeout(total=30)
-
-        self.session = aiohttp.ClientSession(
-            connector=connector,
-            timeout=timeout,
-            headers={
-                "User-Agent": self.user_agent,
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-                "Accept-Language": "en-US,en;q=0.5",
-                "Accept-Encoding": "gzip, deflate",
-                "Connection": "keep-alive",
-                "Upgrade-Insecure-Requests": "1",
-            }
-        )
+        if self.shared:
+            self.session = await get_session()
+        else:
+            self.session = _create_session()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit."""
-        if self.session:
+        # The shared session outlives this instance; only close our own
+        if self.session and not self.shared:
             await self.session.close()
 
+    async def _wait_for_host(self, url: str) -> None:
+        """Wait until request_delay has passed since the last request to this host."""
+        host = urlparse(url).netloc
+        lock = self._host_locks.setdefault(host, asyncio.Lock())
+
+        async with lock:
+            elapsed = time.monotonic() - self._host_last_hit.get(host, float("-inf"))
+            if elapsed < self.request_delay:
+                await asyncio.sleep(self.request_delay - elapsed)
+            self._host_last_hit[host] = time.monotonic()
+
     async def scrape_url(self, url: str, extract_type: str = "text") -> Dict[str, Any]:
-        """Scrape content from a URL."""
+        """Scrape content from a URL.
+
+        Successful results are cached, so repeat scrapes of the same page
+        (ignoring tracking parameters) skip the network and parsing. Cache hits
+        get their own copy carrying the requested ``url``; a freshly fetched
+        result is the cached entry itself and should be treated as read-only.
+        """
         if not self.session:
             raise RuntimeError("WebScraper must be used as async context manager")
 
+        key = (self.clean_url(url), extract_type)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            result = copy.deepcopy(cached)
+            result["url"] = url
+            return result
+
+        result = await self._fetch_url(url, extract_type)
+
+        if result.get("success", True):
+            self._cache[key] = result
+            if len(self._cache) > self._cache_max:
+                self._cache.popitem(last=False)
+
+        return result
+
+    async def _fetch_url(self, url: str, extract_type: str) -> Dict[str, Any]:
+        """Fetch a URL and run the extractor for extract_type on the response."""
         try:
             logger.info(f"Scraping URL: {url}")
 
             # Add delay to be respectful to servers
-            await asyncio.sleep(self.request_delay)
+            await self._wait_for_host(url)
+
+            if extract_type == "head_only":
+                async with self.session.head(url, allow_redirects=True) as response:
+                    return {
+                        "url": url,
+                        "headers": _kept_headers(response.headers),
+                        "status_code": response.status,
+                        "success": True
+                    }
 
             async with self.session.get(url) as response:
-                response.raise_for_status()
-
-                if extract_type == "text":
-                    content = await response.text()
-                    return self._extract_text_content(content, url)
-                elif extract_type == "links":
-                    content = await response.text()
-                    return self._extract_links(content, url)
+                # Read raw bytes rather than response.text(): without a charset
+                # in Content-Type aiohttp would sniff the whole body in Python,
+                # whereas the parser detects the encoding itself.
+                if extract_type == "metadata" and self.metadata_head_only:
+                    # Metadata lives in <head>; skip downloading the rest of the page
+                    content = await _read_head(response.content)
+                else:
+                    content = await response.read()
+                encoding = response.charset
+
+                if extract_type in ("text", "links"):
+                    return await _run_parser(extract_type, content, url, encoding)
                 elif extract_type == "metadata":
-                    content = await response.text()
-                    return self._extract_metadata(content, url, response.headers)
+                    # Headers are filtered here so only a plain dict is sent to the parse pool
+                    return await _run_parser(extract_type, content, url, encoding, _kept_headers(response.headers))
                 else:
-                    content = await response.text()
                     return {
                         "url": url,
-                        "content": content,
+                        "content": _decode(content, encoding),
                         "content_type": response.headers.get("content-type", ""),
                         "status_code": response.status
                     }
@@ -84,247 +608,97 @@ class WebScraper:
                 "success": False
             }
 
-    def _extract_text_content(self, html_content: str, url: str) -> Dict[str, Any]:
-        """Extract readable text content from HTML."""
-        try:
-            from bs4 import BeautifulSoup
-
-            soup = BeautifulSoup(html_content, 'html.parser')
-
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
-
-            # Extract title
-            title = ""
-            title_tag = soup.find('title')
-            if title_tag:
-                title = title_tag.get_text().strip()
-
-            # Extract meta description
-            description = ""
-            meta_desc = soup.find('meta', attrs={'name': 'description'})
-            if meta_desc:
-                description = meta_desc.get('content', '').strip()
-
-            # Extract main content
-            # Try common content selectors
-            content_selectors = [
-                'main',
-                '[role="main"]',
-                '.content',
-                '.post-content',
-                '.entry-content',
-                'article',
-                '.article-content'
-            ]
-
-            main_content = ""
-            for selector in content_selectors:
-                content_elem = soup.select_one(selector)
-                if content_elem:
-                    main_content = content_elem.get_text(separator=' ', strip=True)
-                    break
-
-            # Fallback to body text if no main content found
-            if not main_content:
-                body = soup.find('body')
-                if body:
-                    main_content = body.get_text(separator=' ', strip=True)
-
-            # Clean up whitespace
-            main_content = re.sub(r'\s+', ' ', main_content).strip()
-
-            return {
-                "url": url,
-                "title": title,
-                "description": description,
-                "content": main_content,
-                "word_count": len(main_content.split()),
-                "success": True
-            }
-
-        except ImportError:
-            logger.warning("BeautifulSoup not available, returning raw content")
-            return {
-                "url": url,
-                "content": html_content,
-                "success": True,
-                "note": "BeautifulSoup not available for parsing"
-            }
-        except Exception as e:
-            logger.error(f"Error extracting text content: {e}")
-            return {
-                "url": url,
-                "error": str(e),
-                "success": False
-            }
+    # Kept as attributes for callers that parse already-fetched HTML
+    _extract_text_content = staticmethod(_extract_text_content)
+    _extract_links = staticmethod(_extract_links)
+    _extract_metadata = staticmethod(_extract_metadata)
 
-    def _extract_links(self, html_content: str, base_url: str) -> Dict[str, Any]:
-        """Extract links from HTML content."""
-        try:
-            from bs4 import BeautifulSoup
-
-            soup = BeautifulSoup(html_content, 'html.parser')
-            links = []
+    async def scrape_multiple_urls(self, urls: List[str], extract_type: str = "text") -> List[Dict[str, Any]]:
+        """Scrape multiple URLs concurrently.
 
-            for a_tag in soup.find_all('a', href=True):
-                href = a_tag['href']
-                text = a_tag.get_text().strip()
+        A fixed pool of ``max_concurrent`` workers drains a bounded queue, so
+        memory stays flat regardless of how many URLs are passed in. Results
+        are returned in the same order as ``urls``.
+        """
+        if not self.session:
+            raise RuntimeError("WebScraper must be used as async context manager")
 
-                # Convert relative URLs to absolute
-                if not href.startswith(('http://', 'https://')):
-                    href = urljoin(base_url, href)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(urls)
+        await self._run_worker_pool(urls, extract_type, results.__setitem__)
 
-                links.append({
-                    "url": href,
-                    "text": text,
-                    "title": a_tag.get('title', '')
-                })
+        return results
 
-            return {
-                "url": base_url,
-                "links": links,
-                "link_count": len(links),
-                "success": True
-            }
+    async def scrape_urls_as_completed(
+        self, urls: List[str], extract_type: str = "text"
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Scrape multiple URLs concurrently, yielding each result as soon as it is ready."""
+        if not self.session:
+            raise RuntimeError("WebScraper must be used as async context manager")
 
-        except ImportError:
-            logger.warning("BeautifulSoup not available for link extraction")
-            return {
-                "url": base_url,
-                "links": [],
-                "success": True,
-                "note": "BeautifulSoup not available for parsing"
-            }
-        except Exception as e:
-            logger.error(f"Error extracting links: {e}")
-            return {
-                "url": base_url,
-                "error": str(e),
-                "success": False
-            }
+        finished: asyncio.Queue = asyncio.Queue()
+        pool = asyncio.create_task(
+            self._run_worker_pool(urls, extract_type, lambda _, result: finished.put_nowait(result))
+        )
 
-    def _extract_metadata(self, html_content: str, url: str, headers: Dict[str, str]) -> Dict[str, Any]:
-        """Extract metadata from HTML and headers."""
         try:
-            from bs4 import BeautifulSoup
-
-            soup = BeautifulSoup(html_content, 'html.parser')
-            metadata = {
-                "url": url,
-                "headers": dict(headers),
-                "meta_tags": {},
-                "open_graph": {},
-                "twitter_cards": {}
-            }
-
-            # Extract meta tags
-            for meta in soup.find_all('meta'):
-                name = meta.get('name') or meta.get('property') or meta.get('http-equiv')
-                content = meta.get('content')
-                if name and content:
-                    metadata["meta_tags"][name] = content
-
-                    # Categorize Open Graph tags
-                    if name.startswith('og:'):
-                        metadata["open_graph"][name[3:]] = content
-
-                    # Categorize Twitter Card tags
-                    if name.startswith('twitter:'):
-                        metadata["twitter_cards"][name[8:]] = content
-
-            # Extract additional metadata
-            metadata.update({
-                "title": soup.find('title').get_text().strip() if soup.find('title') else "",
-                "language": soup.find('html').get('lang') if soup.find('html') else "",
-                "success": True
-            })
-
-            return metadata
-
-        except ImportError:
-            logger.warning("BeautifulSoup not available for metadata extraction")
-            return {
-                "url": url,
-                "headers": dict(headers),
-                "success": True,
-                "note": "BeautifulSoup not available for parsing"
-            }
+            for _ in range(len(urls)):
+                yield await finished.get()
+            await pool
+        finally:
+            # Stop the workers if the caller stops iterating early
+            if not pool.done():
+                pool.cancel()
+                await asyncio.gather(pool, return_exceptions=True)
+
+    async def _run_worker_pool(
+        self,
+        urls: List[str],
+        extract_type: str,
+        on_result: Callable[[int, Dict[str, Any]], None]
+    ) -> None:
+        """Scrape urls with max_concurrent workers, reporting (index, result) as each completes."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_concurrent * 2)
+        num_workers = min(self.max_concurrent, len(urls))
+
+        async def produce():
+            for item in enumerate(urls):
+                await queue.put(item)
+            # One sentinel per worker signals shutdown
+            for _ in range(num_workers):
+                await queue.put(None)
+
+        async def work():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+
+                index, url = item
+                on_result(index, await self._scrape_url_safe(url, extract_type))
+
+        await asyncio.gather(produce(), *[work() for _ in range(num_workers)])
+
+    async def _scrape_url_safe(self, url: str, extract_type: str) -> Dict[str, Any]:
+        """Scrape a URL, turning any exception into an error result."""
+        try:
+            return await self.scrape_url(url, extract_type)
         except Exception as e:
-            logger.error(f"Error extracting metadata: {e}")
             return {
                 "url": url,
                 "error": str(e),
                 "success": False
             }
 
-    async def scrape_multiple_urls(self, urls: List[str], extract_type: str = "text") -> List[Dict[str, Any]]:
-        """Scrape multiple URLs concurrently."""
-        if not self.session:
-            raise RuntimeError("WebScraper must be used as async context manager")
-
-        # Create tasks for concurrent scraping
-        tasks = []
-        semaphore = asyncio.Semaphore(self.max_concurrent)
-
-        async def scrape_with_semaphore(url):
-            async with semaphore:
-                return await self.scrape_url(url, extract_type)
-
-        for url in urls:
-            task = asyncio.create_task(scrape_with_semaphore(url))
-            tasks.append(task)
-
-        # Wait for all tasks to complete
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        # Handle exceptions in results
-        processed_results = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                processed_results.append({
-                    "url": urls[i],
-                    "error": str(result),
-                    "success": False
-                })
-            else:
-                processed_results.append(result)
-
-        return processed_results
-
     def is_valid_url(self, url: str) -> bool:
         """Check if a URL is valid and accessible."""
-        try:
-            parsed = urlparse(url)
-            return bool(parsed.scheme and parsed.netloc)
-        except Exception:
+        if not url:
             return False
 
+        return _is_valid_url(url)
+
     def clean_url(self, url: str) -> str:
         """Clean and normalize a URL."""
         if not url:
             return ""
 
-        # Remove common tracking parameters
-        tracking_params = [
-            'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content',
-            'fbclid', 'gclid', 'msclkid', '_ga', '_gl'
-        ]
-
-        try:
-            parsed = urlparse(url)
-            query_params = []
-            if parsed.query:
-                from urllib.parse import parse_qs, urlencode
-                params = parse_qs(parsed.query)
-                for key in tracking_params:
-                    params.pop(key, None)
-                if params:
-                    query_params = [urlencode(params, doseq=True)]
-
-            # Reconstruct URL
-            cleaned = parsed._replace(query='&'.join(query_params) if query_params else '')
-            return cleaned.geturl()
-        except Exception:
-            return url
\ No newline at end of file
+        return _clean_url(url)
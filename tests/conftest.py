@@ -1,24 +1,59 @@
 """Pytest configuration and fixtures."""
 
 import asyncio
+import copy
 import pytest
+import pytest_asyncio
 import os
-from unittest.mock import Mock, AsyncMock
+from unittest.mock import Mock, AsyncMock, patch
 from pathlib import Path
 
-from config.settings import config
+from agents.base_agent import BaseAgent
+from agents.master_agent import MasterAgent
+from config.settings import config, ModelConfig, SystemConfig
 from database.connection import init_database, close_database
+from sqlalchemy.ext.asyncio import AsyncSession
 from services.logger import setup_logging
 
+# Whether captured output of passing tests was requested (-rP / -rA)
+_keep_passed_output = False
+
+def pytest_configure(config):
+    """Record whether passed-test output is needed for the final report."""
+    global _keep_passed_output
+    reportchars = config.getoption("reportchars", "") or ""
+    _keep_passed_output = "P" in reportchars or "A" in reportchars
+
+def pytest_runtest_logreport(report):
+    """Free the stored output of passing tests instead of holding it until the summary."""
+    if report.passed and report.when == "call" and not _keep_passed_output:
+        report.longrepr = None
+        report.sections = []
+
+try:
+    import uvloop
+except ImportError:  # e.g. on Windows, where uvloop is unavailable
+    uvloop = None
+
+def pytest_asyncio_loop_factories(config, item):
+    """Run the session's event loop on uvloop when available."""
+    if uvloop is not None:
+        return {"uvloop": uvloop.new_event_loop}
+    return {"asyncio": asyncio.new_event_loop}
+
 @pytest.fixture(scope="session")
-def event_loop():
-    """Create an instance of the default event loop for the test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
-
-@pytest.fixture(scope="session", autouse=True)
-async def setup_test_environment():
+def test_database_url(tmp_path_factory):
+    """Point the system at a throwaway SQLite database, one per xdist worker."""
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+    db_path = tmp_path_factory.mktemp(f"db_{worker}") / "test.db"
+    url = f"sqlite+aiosqlite:///{db_path}"
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(config, "database_url", url)
+        yield url
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session", autouse=True)
+async def setup_test_environment(test_database_url):
     """Set up test environment before running tests."""
     # Set up test logging
     setup_logging(level="WARNING")  # Reduce log noise during tests
@@ -31,7 +66,113 @@ async def setup_test_environment():
     # Clean up
     await close_database()
 
+@pytest.fixture(scope="session")
+def default_system_config():
+    """Build one SystemConfig for tests that only read the defaults."""
+    with patch.dict(os.environ, {"OPENROUTER_API_KEY": "test-api-key"}):
+        return SystemConfig()
+
 @pytest.fixture
+def env_config(request):
+    """Build a SystemConfig from exactly the environment given via indirect parametrization."""
+    with patch.dict(os.environ, request.param, clear=True):
+        yield SystemConfig()
+
+@pytest.fixture(scope="session")
+def model_config():
+    """Create a model configuration (shared; tests treat it as read-only)."""
+    return ModelConfig(
+        name="test-model",
+        max_tokens=1000,
+        temperature=0.7
+    )
+
+# Construction-only stand-in for OpenRouterClient. Keep it a bare Mock: never
+# switch these patches to autospec/create_autospec, which introspects the
+# whole class on every call and is orders of magnitude slower.
+_ORC_MOCK = Mock()
+
+class _TestAgent(BaseAgent):
+    """Smallest concrete BaseAgent; execute stays unimplemented like the abstract base."""
+
+    def execute(self, input_data):
+        raise NotImplementedError
+
+@pytest.fixture(scope="session")
+def _base_agent_template():
+    """Build one concrete BaseAgent for the session; tests get shallow copies."""
+    with patch('agents.base_agent.OpenRouterClient', new=_ORC_MOCK):
+        return _TestAgent("test_agent", "master")
+
+@pytest.fixture
+def base_agent(_base_agent_template):
+    """Create a BaseAgent instance."""
+    return copy.copy(_base_agent_template)
+
+@pytest_asyncio.fixture(scope="module", loop_scope="session")
+async def opened_base_agent(_base_agent_template):
+    """Yield a BaseAgent whose OpenRouter client is already open, shared within a module.
+
+    Tests must undo their own changes to it (e.g. via swap_attr).
+    """
+    async with copy.copy(_base_agent_template) as agent:
+        yield agent
+
+@pytest.fixture(scope="session")
+def _master_agent_template():
+    """Build one MasterAgent for the session; tests get shallow copies."""
+    with patch('agents.master_agent.OpenRouterClient', new=_ORC_MOCK):
+        return MasterAgent()
+
+@pytest.fixture
+def master_agent(_master_agent_template):
+    """Create a MasterAgent instance."""
+    agent = copy.copy(_master_agent_template)
+    # sub_agents is filled in by tests, so each copy needs its own dict
+    agent.sub_agents = {}
+    return agent
+
+_MISSING = object()
+
+@pytest.fixture
+def swap_attr():
+    """Set attributes for one test and restore them afterwards.
+
+    A lighter-weight alternative to patch.object for plain attribute
+    overrides: swap_attr(obj, "name", value) installs value and returns it.
+    """
+    saved = []
+
+    def swap(target, name, value):
+        saved.append((target, name, target.__dict__.get(name, _MISSING)))
+        setattr(target, name, value)
+        return value
+
+    yield swap
+
+    for target, name, original in reversed(saved):
+        if original is _MISSING:
+            delattr(target, name)
+        else:
+            setattr(target, name, original)
+
+@pytest.fixture(scope="session")
+def mock_db_session_factory():
+    """Build AsyncSession-shaped mocks; only awaitable methods are AsyncMocks."""
+    def factory():
+        session = AsyncMock(spec=AsyncSession)
+        session.__aenter__.return_value = session
+        return session
+    return factory
+
+@pytest.fixture
+def mock_db_session(mock_db_session_factory, monkeypatch):
+    """Route database.connection sessions to a fresh mock session."""
+    session = mock_db_session_factory()
+    monkeypatch.setattr('database.connection.AsyncSessionLocal', Mock(return_value=session))
+    return session
+
+@pytest.fixture(scope="module")
 def mock_openrouter_response():
     """Mock OpenRouter API response."""
     return {
@@ -51,7 +192,7 @@ def mock_openrouter_response():
         }
     }
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_topic_analysis():
     """Mock topic analysis data."""
     return {
@@ -62,7 +203,7 @@ def mock_topic_analysis():
         "style": "professional yet accessible"
     }
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_research_results():
     """Mock research results data."""
     return {
@@ -87,7 +228,7 @@ def mock_research_results():
         "credibility_score": 0.8
     }
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_keywords_data():
     """Mock keywords and hashtags data."""
     return {
@@ -116,7 +257,7 @@ def mock_keywords_data():
         "categories": ["primary", "long_tail", "technical"]
     }
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_linkedin_post():
     """Sample LinkedIn post content."""
     return """Excited to share some insights on how AI is revolutionizing healthcare! 🤖🏥
@@ -133,7 +274,7 @@ The future of healthcare is here, and it's intelligent! What are your thoughts o
 
 #AIHealthcare #MedicalInnovation #DigitalTransformation"""
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_voice_dialog():
     """Sample voice dialog script."""
     return """[Opening music fades in]
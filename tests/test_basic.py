@@ -1,12 +1,19 @@
-"""Basic tests for the agentic system."""
+"""Basic tests for the agentic system.
+
+PYTEST_DONT_REWRITE
+"""
 
 import pytest
 import asyncio
-from unittest.mock import Mock, patch
+from unittest.mock import Mock, MagicMock, AsyncMock, patch
 
 from config.settings import config
 from agents.master_agent import MasterAgent
 from database.connection import init_database, close_database
+from database.models import Base
+
+# Bare Mock for import/construction-only patches; avoid autospec here (slow)
+_ORC_MOCK = Mock()
 
 class TestBasicFunctionality:
     """Basic functionality tests."""
@@ -20,14 +27,31 @@ class TestBasicFunctionality:
     def test_master_agent_initialization(self):
         """Test that Master Agent can be initialized."""
         # Mock the OpenRouter client to avoid API calls
-        with patch('agents.master_agent.OpenRouterClient'):
+        with patch('agents.master_agent.OpenRouterClient', new=_ORC_MOCK):
             master = MasterAgent()
             assert master.name == "master"
             assert hasattr(master, 'execute')
 
-    @pytest.mark.asyncio
     async def test_database_initialization(self):
-        """Test database initialization."""
+        """Test that database initialization creates the engine and tables."""
+        engine = MagicMock()
+        engine.dispose = AsyncMock()
+        conn = engine.begin.return_value.__aenter__.return_value = AsyncMock()
+
+        with patch('database.connection._engine', None), \
+             patch('database.connection.AsyncSessionLocal', None), \
+             patch('database.connection.create_async_engine', return_value=engine) as mock_create_engine:
+            await init_database()
+            await close_database()
+
+        mock_create_engine.assert_called_once()
+        assert mock_create_engine.call_args[0][0] == config.database_url
+        conn.run_sync.assert_awaited_once_with(Base.metadata.create_all)
+        engine.dispose.assert_awaited_once()
+
+    @pytest.mark.integration
+    async def test_database_initialization_real_engine(self):
+        """Test database initialization against a real SQLite engine."""
         try:
             await init_database()
             # If we get here without exception, database init worked
@@ -53,30 +77,12 @@ class TestBasicFunctionality:
 class TestAgentCommunication:
     """Test agent communication patterns."""
 
-    @pytest.mark.asyncio
     async def test_agent_execution_flow(self):
         """Test the basic agent execution flow."""
         # This is a high-level integration test
         # In a real scenario, you'd mock the OpenRouter API
 
-        with patch('agents.master_agent.OpenRouterClient') as mock_client:
-            # Mock the OpenRouter client
-            mock_instance = Mock()
-            mock_client.return_value = mock_instance
-            mock_instance.__aenter__ = Mock(return_value=mock_instance)
-            mock_instance.__aexit__ = Mock(return_value=None)
-
-            # Mock the API response
-            mock_response = {
-                "choices": [{
-                    "message": {
-                        "content": '{"themes": ["test"], "audience": "general", "goals": ["inform"], "research_directions": ["web"], "style": "casual"}'
-                    }
-                }],
-                "usage": {"total_tokens": 100}
-            }
-            mock_instance.chat_completion = Mock(return_value=mock_response)
-
+        with patch('agents.master_agent.OpenRouterClient', new=_ORC_MOCK):
             # Test Master Agent execution
             master = MasterAgent()
 
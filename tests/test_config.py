@@ -1,11 +1,18 @@
-"""Tests for configuration management system."""
+"""Tests for configuration management system.
+
+PYTEST_DONT_REWRITE
+"""
 
 import pytest
 import os
+import re
 from unittest.mock import patch, Mock
 
 from config.settings import SystemConfig, ModelConfig, AgentConfig
 
+_UNKNOWN_AGENT_RE = re.compile(r"Unknown agent: invalid_agent")
+_API_KEY_REQUIRED_RE = re.compile(r"OPENROUTER_API_KEY environment variable is required")
+
 class TestModelConfig:
     """Test ModelConfig class."""
 
@@ -66,7 +73,7 @@ class TestAgentConfig:
 class TestSystemConfig:
     """Test SystemConfig class."""
 
-    @patch.dict(os.environ, {
+    @pytest.mark.parametrize("env_config", [{
         "OPENROUTER_API_KEY": "test-api-key",
         "DATABASE_URL": "sqlite+aiosqlite:///./test.db",
         "LOG_LEVEL": "DEBUG",
@@ -74,10 +81,10 @@ class TestSystemConfig:
         "TIMEOUT_SECONDS": "60",
         "MASTER_MODEL": "perplexity/sonar",
         "RESEARCH_MODEL": "perplexity/sonar"
-    })
-    def test_system_config_with_env_vars(self):
+    }], indirect=True)
+    def test_system_config_with_env_vars(self, env_config):
         """Test SystemConfig loading from environment variables."""
-        config = SystemConfig()
+        config = env_config
 
         assert config.openrouter_api_key == "test-api-key"
         assert config.database_url == "sqlite+aiosqlite:///./test.db"
@@ -95,9 +102,9 @@ class TestSystemConfig:
             assert config.max_retries == 3
             assert config.timeout_seconds == 30
 
-    def test_system_config_model_setup(self):
+    def test_system_config_model_setup(self, default_system_config):
         """Test that models are properly configured."""
-        config = SystemConfig()
+        config = default_system_config
 
         assert "master" in config.models
         assert "research" in config.models
@@ -111,9 +118,9 @@ class TestSystemConfig:
         assert master_model.max_tokens == 4000
         assert master_model.temperature == 0.7
 
-    def test_system_config_agent_setup(self):
+    def test_system_config_agent_setup(self, default_system_config):
         """Test that agents are properly configured."""
-        config = SystemConfig()
+        config = default_system_config
 
         assert "master" in config.agents
         assert "web_researcher" in config.agents
@@ -126,35 +133,28 @@ class TestSystemConfig:
         assert master_agent.name == "master"
         assert master_agent.max_retries == 3
 
-    def test_get_model_config(self):
+    def test_get_model_config(self, default_system_config):
         """Test getting model configuration by agent name."""
-        config = SystemConfig()
+        config = default_system_config
 
         model_config = config.get_model_config("master")
         assert isinstance(model_config, ModelConfig)
         assert model_config.name == "perplexity/sonar"
 
-    def test_get_model_config_invalid_agent(self):
-        """Test getting model config for invalid agent."""
-        config = SystemConfig()
-
-        with pytest.raises(ValueError, match="Unknown agent: invalid_agent"):
-            config.get_model_config("invalid_agent")
-
-    def test_get_agent_config(self):
+    def test_get_agent_config(self, default_system_config):
         """Test getting agent configuration."""
-        config = SystemConfig()
+        config = default_system_config
 
         agent_config = config.get_agent_config("master")
         assert isinstance(agent_config, AgentConfig)
         assert agent_config.name == "master"
 
-    def test_get_agent_config_invalid_agent(self):
-        """Test getting agent config for invalid agent."""
-        config = SystemConfig()
-
-        with pytest.raises(ValueError, match="Unknown agent: invalid_agent"):
-            config.get_agent_config("invalid_agent")
+    @pytest.mark.parametrize("getter", ["get_model_config", "get_agent_config"])
+    def test_get_config_invalid_agent(self, default_system_config, getter):
+        """Test getting model or agent config for invalid agent."""
+        with pytest.raises(ValueError) as exc_info:
+            getattr(default_system_config, getter)("invalid_agent")
+        assert _UNKNOWN_AGENT_RE.search(str(exc_info.value))
 
     def test_config_validation_with_api_key(self):
         """Test config validation with API key."""
@@ -168,33 +168,34 @@ class TestSystemConfig:
         with patch.dict(os.environ, {}, clear=True):
             config = SystemConfig()
 
-            with pytest.raises(ValueError, match="OPENROUTER_API_KEY environment variable is required"):
+            with pytest.raises(ValueError) as exc_info:
                 config.validate_config()
+            assert _API_KEY_REQUIRED_RE.search(str(exc_info.value))
 
-    @patch.dict(os.environ, {
+    @pytest.mark.parametrize("env_config", [{
         "OPENROUTER_API_KEY": "test-key",
         "GOOGLE_API_KEY": "google-key",
         "GOOGLE_CSE_ID": "cse-id",
         "BING_API_KEY": "bing-key"
-    })
-    def test_optional_api_keys(self):
+    }], indirect=True)
+    def test_optional_api_keys(self, env_config):
         """Test optional API key configuration."""
-        config = SystemConfig()
+        config = env_config
 
         assert config.google_api_key == "google-key"
         assert config.google_cse_id == "cse-id"
         assert config.bing_api_key == "bing-key"
 
-    def test_web_scraping_config(self):
+    @pytest.mark.parametrize("env_config", [{
+        "OPENROUTER_API_KEY": "test-key",
+        "USER_AGENT": "CustomAgent/1.0",
+        "MAX_CONCURRENT_REQUESTS": "20",
+        "REQUEST_DELAY": "2.5"
+    }], indirect=True)
+    def test_web_scraping_config(self, env_config):
         """Test web scraping configuration."""
-        with patch.dict(os.environ, {
-            "OPENROUTER_API_KEY": "test-key",
-            "USER_AGENT": "CustomAgent/1.0",
-            "MAX_CONCURRENT_REQUESTS": "20",
-            "REQUEST_DELAY": "2.5"
-        }):
-            config = SystemConfig()
+        config = env_config
 
-            assert config.user_agent == "CustomAgent/1.0"
-            assert config.max_concurrent_requests == 20
-            assert config.request_delay == 2.5
\ No newline at end of file
+        assert config.user_agent == "CustomAgent/1.0"
+        assert config.max_concurrent_requests == 20
+        assert config.request_delay == 2.5
\ No newline at end of file
@@ -1,11 +1,23 @@
 """Tests for database models and connection."""
 
+import json
 import pytest
-from unittest.mock import patch, AsyncMock
+from unittest.mock import Mock, patch, AsyncMock
 from datetime import datetime
+from sqlalchemy import Update, inspect
+from sqlalchemy.dialects import postgresql, sqlite
 
-from database.models import Session, AgentLog, ResearchResult, Keyword, GeneratedContent, AgentHandoff
-from database.connection import create_session_record, update_session_status, log_agent_action
+from database.models import Session, AgentLog, ResearchResult, Keyword, GeneratedContent, AgentHandoff, JSONText
+from database.connection import (
+    get_db_session, create_session_record, create_session_records, update_session_status, log_agent_action, log_agent_actions_bulk, flush_agent_logs,
+    bulk_insert_keywords, bulk_insert_research
+)
+
+# JSON payloads serialized once at import and shared by the tests below
+_ANALYSIS_JSON = json.dumps({"test": "analysis"})
+_INPUT_JSON = json.dumps({"input": "test"})
+_OUTPUT_JSON = json.dumps({"output": "test"})
+_PAYLOAD_JSON = json.dumps({"topic": "test"})
 
 class TestDatabaseModels:
     """Test database model classes."""
@@ -14,12 +26,12 @@ class TestDatabaseModels:
         """Test creating a Session model instance."""
         session = Session(
             topic="Test Topic",
-            analysis='{"test": "analysis"}',
+            analysis=_ANALYSIS_JSON,
             status="active"
         )
 
         assert session.topic == "Test Topic"
-        assert session.analysis == '{"test": "analysis"}'
+        assert session.analysis == _ANALYSIS_JSON
         assert session.status == "active"
         assert session.completed_at is None
         assert isinstance(session.created_at, datetime)
@@ -30,8 +42,8 @@ class TestDatabaseModels:
             session_id=1,
             agent_name="test_agent",
             action="test_action",
-            input_data='{"input": "test"}',
-            output_data='{"output": "test"}',
+            input_data=_INPUT_JSON,
+            output_data=_OUTPUT_JSON,
             duration_ms=100,
             success=True
         )
@@ -39,8 +51,8 @@ class TestDatabaseModels:
         assert agent_log.session_id == 1
         assert agent_log.agent_name == "test_agent"
         assert agent_log.action == "test_action"
-        assert agent_log.input_data == '{"input": "test"}'
-        assert agent_log.output_data == '{"output": "test"}'
+        assert agent_log.input_data == _INPUT_JSON
+        assert agent_log.output_data == _OUTPUT_JSON
         assert agent_log.duration_ms == 100
         assert agent_log.success is True
 
@@ -100,7 +112,7 @@ class TestDatabaseModels:
             from_agent="master",
             to_agent="web_researcher",
             action="research_topic",
-            payload='{"topic": "test"}',
+            payload=_PAYLOAD_JSON,
             response_time_ms=500
         )
 
@@ -108,160 +120,209 @@ class TestDatabaseModels:
         assert handoff.from_agent == "master"
         assert handoff.to_agent == "web_researcher"
         assert handoff.action == "research_topic"
-        assert handoff.payload == '{"topic": "test"}'
+        assert handoff.payload == _PAYLOAD_JSON
         assert handoff.response_time_ms == 500
 
+    def test_json_text_serializes_non_strings(self):
+        """Test that JSON columns accept dicts as well as pre-serialized strings."""
+        json_type = AgentLog.__table__.c.input_data.type
+
+        assert isinstance(json_type, JSONText)
+        assert json_type.process_bind_param({"input": "test"}, None) == _INPUT_JSON
+        assert json_type.process_bind_param(_INPUT_JSON, None) is _INPUT_JSON
+        assert json_type.process_bind_param(None, None) is None
+
+    def test_session_ids_are_bigint_outside_sqlite(self):
+        """Test that session ids are 64-bit on PostgreSQL and autoincrementing on SQLite."""
+        for column in (Session.__table__.c.id, AgentLog.__table__.c.session_id):
+            assert column.type.compile(dialect=postgresql.dialect()) == "BIGINT"
+            assert column.type.compile(dialect=sqlite.dialect()) == "INTEGER"
+
 class TestDatabaseConnection:
     """Test database connection functions."""
 
-    @pytest.mark.asyncio
-    async def test_create_session_record(self):
-        """Test creating a session record."""
-        with patch('database.connection.get_db_session') as mock_get_session:
-            mock_session = AsyncMock()
-            mock_get_session.return_value = mock_session
+    async def test_get_db_session_requires_init(self):
+        """Test that sessions cannot be opened before the database is initialized."""
+        with patch('database.connection.AsyncSessionLocal', None):
+            with pytest.raises(RuntimeError):
+                async with get_db_session():
+                    pass
 
-            # Mock the session creation and commit
-            mock_db_session = Mock()
-            mock_session.add.return_value = None
-            mock_session.commit.return_value = None
-            mock_session.refresh.return_value = None
-            mock_db_session.id = 123
+    async def test_create_session_record(self, mock_db_session):
+        """Test creating a session record."""
+        # Mock the session creation and commit
+        mock_record = Mock()
+        mock_db_session.add.return_value = None
+        mock_db_session.commit.return_value = None
+        mock_db_session.refresh.return_value = None
+        mock_record.id = 123
 
-            session_id = await create_session_record("Test Topic", '{"analysis": "test"}')
+        session_id = await create_session_record("Test Topic", _ANALYSIS_JSON)
 
-            # Verify the function was called correctly
-            assert mock_session.add.called
-            assert mock_session.commit.called
+        # Verify the function was called correctly
+        assert mock_db_session.add.called
+        assert mock_db_session.commit.called
 
-    @pytest.mark.asyncio
-    async def test_update_session_status(self):
-        """Test updating session status."""
-        with patch('database.connection.get_db_session') as mock_get_session:
-            mock_session = AsyncMock()
-            mock_db_session = Mock()
-            mock_get_session.return_value = mock_session
-            mock_session.get.return_value = mock_db_session
+    async def test_create_session_records_bulk(self, mock_db_session):
+        """Test that many session records are inserted with a single statement."""
+        mock_db_session.execute.return_value = [(i,) for i in range(1, 1001)]
 
-            await update_session_status(1, "completed")
+        ids = await create_session_records([(f"Topic {i}", None) for i in range(1000)])
 
-            # Verify the session was retrieved and updated
-            mock_session.get.assert_called_with(Session, 1)
-            assert mock_db_session.status == "completed"
-            assert mock_session.commit.called
+        assert ids == list(range(1, 1001))
+        mock_db_session.execute.assert_awaited_once()
+        _, rows = mock_db_session.execute.call_args.args
+        assert len(rows) == 1000
+        assert rows[0] == {"topic": "Topic 0", "analysis": None, "status": "active"}
+        mock_db_session.commit.assert_awaited_once()
 
-    @pytest.mark.asyncio
-    async def test_update_session_status_with_error(self):
+    async def test_update_session_status(self, mock_db_session):
+        """Test updating session status."""
+        await update_session_status(1, "completed")
+
+        # Verify a single UPDATE was issued instead of a get and assignment
+        mock_db_session.get.assert_not_called()
+        stmt = mock_db_session.execute.call_args.args[0]
+        assert isinstance(stmt, Update)
+        params = stmt.compile().params
+        assert params["status"] == "completed"
+        assert isinstance(params["completed_at"], datetime)
+        assert params["id_1"] == 1
+        mock_db_session.commit.assert_awaited_once()
+
+    async def test_update_session_status_with_error(self, mock_db_session):
         """Test updating session status with error message."""
-        with patch('database.connection.get_db_session') as mock_get_session:
-            mock_session = AsyncMock()
-            mock_db_session = Mock()
-            mock_get_session.return_value = mock_session
-            mock_session.get.return_value = mock_db_session
-
-            await update_session_status(1, "failed", "Test error")
+        await update_session_status(1, "failed", "Test error")
 
-            assert mock_db_session.status == "failed"
-            assert mock_db_session.error_message == "Test error"
-            assert mock_session.commit.called
+        params = mock_db_session.execute.call_args.args[0].compile().params
+        assert params["status"] == "failed"
+        assert params["error_message"] == "Test error"
+        assert "completed_at" not in params
+        mock_db_session.commit.assert_awaited_once()
 
-    @pytest.mark.asyncio
-    async def test_log_agent_action(self):
+    async def test_log_agent_action(self, mock_db_session):
         """Test logging agent action."""
-        with patch('database.connection.get_db_session') as mock_get_session:
-            mock_session = AsyncMock()
-            mock_get_session.return_value = mock_session
-
-            await log_agent_action(
-                session_id=1,
-                agent_name="test_agent",
-                action="test_action",
-                input_data='{"input": "test"}',
-                output_data='{"output": "test"}',
-                duration_ms=100,
-                success=True
-            )
-
-            # Verify the log entry was added and committed
-            assert mock_session.add.called
-            assert mock_session.commit.called
-
-    @pytest.mark.asyncio
-    async def test_log_agent_action_with_error(self):
-        """Test logging agent action with error."""
-        with patch('database.connection.get_db_session') as mock_get_session:
-            mock_session = AsyncMock()
-            mock_get_session.return_value = mock_session
-
-            await log_agent_action(
-                session_id=1,
-                agent_name="test_agent",
-                action="test_action",
-                success=False,
-                error_message="Test error"
-            )
-
-            # Verify error was logged
-            assert mock_session.add.called
-            assert mock_session.commit.called
-
-    def test_session_relationships(self):
-        """Test that Session model relationships are properly configured."""
-        session = Session(topic="Test")
-
-        # Check that relationship attributes exist
-        assert hasattr(session, 'agent_logs')
-        assert hasattr(session, 'research_results')
-        assert hasattr(session, 'keywords')
-        assert hasattr(session, 'generated_content')
-        assert hasattr(session, 'agent_handoffs')
-
-    def test_agent_log_relationships(self):
-        """Test that AgentLog model relationships are properly configured."""
-        agent_log = AgentLog(
+        await log_agent_action(
             session_id=1,
-            agent_name="test",
-            action="test"
-        )
-
-        # Check that relationship attributes exist
-        assert hasattr(agent_log, 'session')
-
-    def test_research_result_relationships(self):
-        """Test that ResearchResult model relationships are properly configured."""
-        research_result = ResearchResult(
-            session_id=1,
-            content="test content"
-        )
-
-        assert hasattr(research_result, 'session')
-
-    def test_keyword_relationships(self):
-        """Test that Keyword model relationships are properly configured."""
-        keyword = Keyword(
-            session_id=1,
-            keyword="test"
-        )
-
-        assert hasattr(keyword, 'session')
-
-    def test_generated_content_relationships(self):
-        """Test that GeneratedContent model relationships are properly configured."""
-        content = GeneratedContent(
-            session_id=1,
-            content_type="test",
-            content="test content"
+            agent_name="test_agent",
+            action="test_action",
+            input_data=_INPUT_JSON,
+            output_data=_OUTPUT_JSON,
+            duration_ms=100,
+            success=True
         )
+        await flush_agent_logs()
 
-        assert hasattr(content, 'session')
+        # Verify the queued entry was written as a batch and committed
+        _, rows = mock_db_session.execute.call_args.args
+        assert isinstance(rows, list)
+        assert rows[0]["agent_name"] == "test_agent"
+        assert rows[0]["duration_ms"] == 100
+        mock_db_session.commit.assert_awaited_once()
 
-    def test_agent_handoff_relationships(self):
-        """Test that AgentHandoff model relationships are properly configured."""
-        handoff = AgentHandoff(
+    async def test_log_agent_action_with_error(self, mock_db_session):
+        """Test logging agent action with error."""
+        await log_agent_action(
             session_id=1,
-            from_agent="test1",
-            to_agent="test2",
-            action="test"
+            agent_name="test_agent",
+            action="test_action",
+            success=False,
+            error_message="Test error"
         )
-
-        assert hasattr(handoff, 'session')
\ No newline at end of file
+        await flush_agent_logs()
+
+        # Verify error was logged
+        _, rows = mock_db_session.execute.call_args.args
+        assert rows[0]["success"] is False
+        assert rows[0]["error_message"] == "Test error"
+        mock_db_session.commit.assert_awaited_once()
+
+    async def test_log_agent_action_batches_commits(self, mock_db_session):
+        """Test that many queued log entries are written with a single commit."""
+        for i in range(1000):
+            await log_agent_action(session_id=1, agent_name="test_agent", action=f"action_{i}")
+        await flush_agent_logs()
+
+        mock_db_session.execute.assert_awaited_once()
+        _, rows = mock_db_session.execute.call_args.args
+        assert len(rows) == 1000
+        mock_db_session.commit.assert_awaited_once()
+
+    async def test_stop_log_flusher_drains_log_queue(self, mock_db_session):
+        """Test that stopping the flusher writes queued logs and releases the queue."""
+        import database.connection as connection
+
+        await log_agent_action(session_id=1, agent_name="test_agent", action="last_action")
+        await connection._stop_log_flusher()
+
+        _, rows = mock_db_session.execute.call_args.args
+        assert [row["action"] for row in rows] == ["last_action"]
+        assert connection._log_queue is None
+        assert connection._log_flusher_task is None
+
+    async def test_stop_log_flusher_keeps_good_rows_when_one_fails(self, mock_db_session):
+        """Test that a rejected row is dropped alone instead of taking its batch with it."""
+        import database.connection as connection
+
+        written = []
+
+        async def execute(statement, rows):
+            if any(row["session_id"] == 999 for row in rows):
+                raise ValueError("stale session")
+            written.extend(row["action"] for row in rows)
+
+        mock_db_session.execute.side_effect = execute
+        for i in range(5):
+            await log_agent_action(session_id=999 if i == 3 else 1, agent_name="test_agent", action=f"action_{i}")
+
+        with patch.object(connection.logger, 'error') as mock_error:
+            await connection._stop_log_flusher()
+
+        assert sorted(written) == ["action_0", "action_1", "action_2", "action_4"]
+        mock_error.assert_called_once()
+        assert "action_3" in mock_error.call_args.args[0]
+
+    async def test_log_agent_actions_bulk_empty(self):
+        """Test that an empty batch does not open a session."""
+        with patch('database.connection.AsyncSessionLocal') as mock_session_local:
+            await log_agent_actions_bulk([])
+
+            assert not mock_session_local.called
+
+    async def test_bulk_insert_keywords(self, mock_db_session):
+        """Test that many keywords are inserted with a single statement."""
+        keywords = [
+            {"keyword": f"kw{i}", "keyword_type": "keyword", "relevance_score": 0.5, "category": "generated"}
+            for i in range(100)
+        ]
+
+        await bulk_insert_keywords(7, keywords)
+
+        mock_db_session.execute.assert_awaited_once()
+        _, rows = mock_db_session.execute.call_args.args
+        assert len(rows) == 100
+        assert rows[0]["session_id"] == 7
+        mock_db_session.commit.assert_awaited_once()
+
+    async def test_bulk_insert_research(self, mock_db_session):
+        """Test that research results are inserted with a single statement."""
+        results = [{"source_url": f"https://example.com/{i}", "title": f"Result {i}"} for i in range(10)]
+
+        await bulk_insert_research(7, results)
+
+        mock_db_session.execute.assert_awaited_once()
+        _, rows = mock_db_session.execute.call_args.args
+        assert [row["session_id"] for row in rows] == [7] * 10
+        mock_db_session.commit.assert_awaited_once()
+
+    @pytest.mark.parametrize("model,expected", [
+        (Session, {"agent_logs", "research_results", "keywords", "generated_content", "agent_handoffs"}),
+        (AgentLog, {"session"}),
+        (ResearchResult, {"session"}),
+        (Keyword, {"session"}),
+        (GeneratedContent, {"session"}),
+        (AgentHandoff, {"session"}),
+    ], ids=["Session", "AgentLog", "ResearchResult", "Keyword", "GeneratedContent", "AgentHandoff"])
+    def test_model_relationships(self, model, expected):
+        """Test that model relationships are properly configured."""
+        assert set(inspect(model).relationships.keys()) >= expected
\ No newline at end of file
@@ -1,33 +1,56 @@
 """Tests for main CLI application."""
 
+import asyncio
+import json
+
 import pytest
-from unittest.mock import patch, AsyncMock
+from unittest.mock import patch, AsyncMock, Mock
 from click.testing import CliRunner
 
-from main import main, display_results
+from main import main, async_main, display_results, _FORMATTERS
 
 class TestMainCLI:
     """Test main CLI functionality."""
 
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def runner(self):
-        """Create CLI runner."""
+        """Create one CLI runner shared by every invocation."""
         return CliRunner()
 
     def test_main_help(self, runner):
         """Test main command help output."""
-        result = runner.invoke(main, ['--help'])
+        result = runner.invoke(main, ['--help'], catch_exceptions=False)
 
         assert result.exit_code == 0
         assert 'Process a topic through the agentic system' in result.output
         assert '--verbose' in result.output
         assert '--session-id' in result.output
 
+    @patch('main.async_main', new_callable=AsyncMock)
+    def test_main_runs_on_configured_loop_factory(self, mock_async_main, runner):
+        """Test that the CLI builds its event loop through the module's loop factory."""
+        loop_factory = Mock(side_effect=asyncio.new_event_loop)
+
+        with patch('main._new_event_loop', loop_factory):
+            result = runner.invoke(main, ['Test Topic'], catch_exceptions=False)
+
+        assert result.exit_code == 0
+        loop_factory.assert_called_once()
+        mock_async_main.assert_awaited_once_with('Test Topic', False, None, 'text')
+
+    def test_loop_factory_prefers_uvloop(self):
+        """Test that uvloop backs the CLI event loop when it is installed."""
+        uvloop = pytest.importorskip("uvloop")
+        import main as main_module
+
+        assert main_module._new_event_loop is uvloop.new_event_loop
+
+    @patch('main.close_database')
     @patch('main.MasterAgent')
     @patch('main.init_database')
     @patch('main.setup_logging')
     @patch('main.config')
-    def test_main_successful_execution(self, mock_config, mock_setup_logging, mock_init_db, mock_master_agent, runner):
+    def test_main_successful_execution(self, mock_config, mock_setup_logging, mock_init_db, mock_master_agent, mock_close_db, runner):
         """Test successful main execution."""
         # Mock configuration
         mock_config.validate_config.return_value = True
@@ -45,27 +68,31 @@ class TestMainCLI:
         }
         mock_master_agent.return_value = mock_instance
 
-        result = runner.invoke(main, ['Test Topic'])
+        result = runner.invoke(main, ['Test Topic'], catch_exceptions=False)
 
         assert result.exit_code == 0
         assert 'Processing complete' in result.output
         assert 'Session ID: 123' in result.output
 
+    @patch('main.close_database')
     @patch('main.config')
-    def test_main_missing_api_key(self, mock_config, runner):
+    async def test_main_missing_api_key(self, mock_config, mock_close_db, caplog):
         """Test main execution with missing API key."""
         mock_config.validate_config.side_effect = ValueError("API key required")
 
-        result = runner.invoke(main, ['Test Topic'])
+        # Call the coroutine behind the command directly; Click adds nothing here
+        with pytest.raises(SystemExit) as exc_info:
+            await async_main('Test Topic', False, None, 'text')
 
-        assert result.exit_code == 1
-        assert 'API key required' in result.output
+        assert exc_info.value.code == 1
+        assert 'API key required' in caplog.text
 
+    @patch('main.close_database')
     @patch('main.MasterAgent')
     @patch('main.init_database')
     @patch('main.setup_logging')
     @patch('main.config')
-    def test_main_with_verbose_flag(self, mock_config, mock_setup_logging, mock_init_db, mock_master_agent, runner):
+    def test_main_with_verbose_flag(self, mock_config, mock_setup_logging, mock_init_db, mock_master_agent, mock_close_db, runner):
         """Test main execution with verbose flag."""
         mock_config.validate_config.return_value = True
         mock_config.openrouter_api_key = "test-key"
@@ -74,17 +101,18 @@ class TestMainCLI:
         mock_instance.process_topic.return_value = {'session_id': 123}
         mock_master_agent.return_value = mock_instance
 
-        result = runner.invoke(main, ['Test Topic', '--verbose'])
+        result = runner.invoke(main, ['Test Topic', '--verbose'], catch_exceptions=False)
 
         assert result.exit_code == 0
         # Verify setup_logging was called with DEBUG level
         mock_setup_logging.assert_called_with(level='DEBUG')
 
+    @patch('main.close_database')
     @patch('main.MasterAgent')
     @patch('main.init_database')
     @patch('main.setup_logging')
     @patch('main.config')
-    def test_main_with_session_id(self, mock_config, mock_setup_logging, mock_init_db, mock_master_agent, runner):
+    def test_main_with_session_id(self, mock_config, mock_setup_logging, mock_init_db, mock_master_agent, mock_close_db, runner):
         """Test main execution with session ID."""
         mock_config.validate_config.return_value = True
         mock_config.openrouter_api_key = "test-key"
@@ -93,17 +121,18 @@ class TestMainCLI:
         mock_instance.process_topic.return_value = {'session_id': 456}
         mock_master_agent.return_value = mock_instance
 
-        result = runner.invoke(main, ['Test Topic', '--session-id', '123'])
+        result = runner.invoke(main, ['Test Topic', '--session-id', '123'], catch_exceptions=False)
 
         assert result.exit_code == 0
         # Verify process_topic was called with session_id
         mock_instance.process_topic.assert_called_with('Test Topic', session_id=123)
 
+    @patch('main.close_database')
     @patch('main.MasterAgent')
     @patch('main.init_database')
     @patch('main.setup_logging')
     @patch('main.config')
-    def test_main_with_json_output(self, mock_config, mock_setup_logging, mock_init_db, mock_master_agent, runner):
+    def test_main_with_json_output(self, mock_config, mock_setup_logging, mock_init_db, mock_master_agent, mock_close_db, runner):
         """Test main execution with JSON output format."""
         mock_config.validate_config.return_value = True
         mock_config.openrouter_api_key = "test-key"
@@ -117,18 +146,19 @@ class TestMainCLI:
         mock_instance.process_topic.return_value = mock_result
         mock_master_agent.return_value = mock_instance
 
-        result = runner.invoke(main, ['Test Topic', '--output-format', 'json'])
+        result = runner.invoke(main, ['Test Topic', '--output-format', 'json'], catch_exceptions=False)
 
         assert result.exit_code == 0
         # Should contain JSON output
         assert '"session_id": 123' in result.output
         assert '"topic": "Test Topic"' in result.output
 
+    @patch('main.close_database')
     @patch('main.MasterAgent')
     @patch('main.init_database')
     @patch('main.setup_logging')
     @patch('main.config')
-    def test_main_execution_error(self, mock_config, mock_setup_logging, mock_init_db, mock_master_agent, runner):
+    def test_main_execution_error(self, mock_config, mock_setup_logging, mock_init_db, mock_master_agent, mock_close_db, runner):
         """Test main execution with processing error."""
         mock_config.validate_config.return_value = True
         mock_config.openrouter_api_key = "test-key"
@@ -215,4 +245,25 @@ class TestDisplayResults:
 
         assert 'Session ID: 789' in output
         assert '📝 Topic: Incomplete Topic' in output
-        # Should not crash with missing fields
\ No newline at end of file
+        # Should not crash with missing fields
+
+    def test_formatters_cover_output_choices(self):
+        """Test that every CLI output format has a formatter."""
+        choices = next(p for p in main.params if p.name == 'output_format').type.choices
+        assert set(choices) == set(_FORMATTERS)
+
+    def test_json_formatter_round_trips(self):
+        """Test that the JSON formatter emits indented, parseable output."""
+        result = {'session_id': 1, 'topic': 'Café', 'keywords': ['a', 'b']}
+
+        output = _FORMATTERS['json'](result)
+
+        assert json.loads(output) == result
+        assert '\n  "session_id": 1' in output
+        assert '"Caf\\u00e9"' in output
+
+    def test_json_formatter_accepts_non_str_keys(self):
+        """Test that non-string keys are coerced as stdlib json does."""
+        output = _FORMATTERS['json']({1: 'one', None: 'none'})
+
+        assert json.loads(output) == {'1': 'one', 'null': 'none'}
\ No newline at end of file
@@ -1,19 +1,28 @@
 """Tests for service classes."""
 
+import asyncio
+import json
 import pytest
+import pytest_asyncio
 from unittest.mock import Mock, patch, AsyncMock
 import aiohttp
 
-from services.openrouter_client import OpenRouterClient
+from services.openrouter_client import OpenRouterClient, _payload_prefix, _payload_template, _tools_key
+from services.search_api import SearchAPI
+from services import web_scraper
+from services.web_scraper import WebScraper, _read_head, _run_parser, aclose_shared_session, shutdown_parse_pool
+from services.sse import iter_sse_deltas
 from services.logger import setup_logging, get_agent_logger
 
 class TestOpenRouterClient:
     """Test OpenRouter API client."""
 
-    @pytest.fixture
-    def client(self):
+    @pytest_asyncio.fixture
+    async def client(self):
         """Create OpenRouter client instance."""
-        return OpenRouterClient("test-api-key")
+        client = OpenRouterClient("test-api-key")
+        yield client
+        await client.close()
 
     def test_client_initialization(self, client):
         """Test client initialization."""
@@ -21,96 +30,193 @@ class TestOpenRouterClient:
         assert client.base_url == "https://openrouter.ai/api/v1"
         assert client.session is None
 
-    @pytest.mark.asyncio
     async def test_context_manager(self, client):
         """Test async context manager."""
         async with client:
-            assert client.session is not None
-            assert isinstance(client.session, aiohttp.ClientSession)
+            # The session is only opened by the first request
+            assert client.session is None
+            session = client._ensure_session()
+            assert isinstance(session, aiohttp.ClientSession)
+            assert client._ensure_session() is session
 
         assert client.session is None
+        assert session.closed
 
-    @pytest.mark.asyncio
     async def test_chat_completion_success(self, client, mock_openrouter_response):
         """Test successful chat completion."""
-        with patch.object(client.session, 'post') as mock_post:
-            mock_response = AsyncMock()
-            mock_response.raise_for_status.return_value = None
-            mock_response.json.return_value = mock_openrouter_response
-            mock_post.return_value = mock_response
-
-            async with client:
-                result = await client.chat_completion(
-                    model="test-model",
-                    messages=[{"role": "user", "content": "test"}]
-                )
+        mock_response = Mock()
+        mock_response.raise_for_status = Mock(return_value=None)
+        mock_response.read = AsyncMock(return_value=json.dumps(mock_openrouter_response).encode())
+
+        with patch.object(client._ensure_session(), 'post') as mock_post:
+            mock_post.return_value.__aenter__.return_value = mock_response
+
+            result = await client.chat_completion(
+                model="test-model",
+                messages=[{"role": "user", "content": "test"}]
+            )
 
-                assert result == mock_openrouter_response
-                mock_post.assert_called_once()
+            assert result == mock_openrouter_response
+            mock_post.assert_called_once()
 
-    @pytest.mark.asyncio
     async def test_chat_completion_with_tools(self, client, mock_openrouter_response):
         """Test chat completion with tools."""
-        with patch.object(client.session, 'post') as mock_post:
-            mock_response = AsyncMock()
-            mock_response.raise_for_status.return_value = None
-            mock_response.json.return_value = mock_openrouter_response
-            mock_post.return_value = mock_response
+        mock_response = Mock()
+        mock_response.raise_for_status = Mock(return_value=None)
+        mock_response.read = AsyncMock(return_value=json.dumps(mock_openrouter_response).encode())
+
+        with patch.object(client._ensure_session(), 'post') as mock_post:
+            mock_post.return_value.__aenter__.return_value = mock_response
 
             tools = [{"type": "function", "function": {"name": "test_tool"}}]
 
-            async with client:
-                result = await client.chat_completion(
-                    model="test-model",
-                    messages=[{"role": "user", "content": "test"}],
-                    tools=tools
-                )
+            await client.chat_completion(
+                model="test-model",
+                messages=[{"role": "user", "content": "test"}],
+                tools=tools
+            )
 
-                # Verify tools were included in the request
-                call_args = mock_post.call_args
-                request_data = call_args[1]['json']
-                assert 'tools' in request_data
-                assert request_data['tools'] == tools
+            # Verify tools were included in the request
+            request_data = json.loads(mock_post.call_args[1]['data'])
+            assert 'tools' in request_data
+            assert request_data['tools'] == tools
 
-    @pytest.mark.asyncio
     async def test_chat_completion_with_parameters(self, client, mock_openrouter_response):
         """Test chat completion with custom parameters."""
-        with patch.object(client.session, 'post') as mock_post:
-            mock_response = AsyncMock()
-            mock_response.raise_for_status.return_value = None
-            mock_response.json.return_value = mock_openrouter_response
-            mock_post.return_value = mock_response
-
-            async with client:
-                result = await client.chat_completion(
-                    model="test-model",
-                    messages=[{"role": "user", "content": "test"}],
-                    temperature=0.5,
-                    max_tokens=100,
-                    top_p=0.9
-                )
-
-                call_args = mock_post.call_args
-                request_data = call_args[1]['json']
-                assert request_data['temperature'] == 0.5
-                assert request_data['max_tokens'] == 100
-                assert request_data['top_p'] == 0.9
+        mock_response = Mock()
+        mock_response.raise_for_status = Mock(return_value=None)
+        mock_response.read = AsyncMock(return_value=json.dumps(mock_openrouter_response).encode())
+
+        with patch.object(client._ensure_session(), 'post') as mock_post:
+            mock_post.return_value.__aenter__.return_value = mock_response
+
+            await client.chat_completion(
+                model="test-model",
+                messages=[{"role": "user", "content": "test"}],
+                temperature=0.5,
+                max_tokens=100,
+                top_p=0.9
+            )
+
+            request_data = json.loads(mock_post.call_args[1]['data'])
+            assert request_data['temperature'] == 0.5
+            assert request_data['max_tokens'] == 100
+            assert request_data['top_p'] == 0.9
 
-    @pytest.mark.asyncio
     async def test_chat_completion_api_error(self, client):
         """Test chat completion with API error."""
-        with patch.object(client.session, 'post') as mock_post:
-            mock_response = AsyncMock()
-            mock_response.raise_for_status.side_effect = aiohttp.ClientError("API Error")
-            mock_post.return_value = mock_response
+        mock_response = Mock()
+        mock_response.raise_for_status = Mock(side_effect=aiohttp.ClientError("API Error"))
 
-            async with client:
+        with patch.object(client._ensure_session(), 'post') as mock_post:
+            mock_post.return_value.__aenter__.return_value = mock_response
+
+            with patch('utils.retry.asyncio.sleep', new_callable=AsyncMock):
                 with pytest.raises(aiohttp.ClientError):
                     await client.chat_completion(
                         model="test-model",
                         messages=[{"role": "user", "content": "test"}]
                     )
 
+    async def test_chat_completion_stream(self, client):
+        """Test streaming content deltas from SSE frames."""
+        async def frames():
+            for line in [
+                b': OPENROUTER PROCESSING\n',
+                b'data: {"choices": [{"delta": {"role": "assistant"}}]}\n',
+                b'data: {"choices": [{"delta": {"content": "Hello"}}]}\n',
+                b'\n',
+                b'data: {"choices": [{"delta": {"content": ", world"}}]}\n',
+                b'data: not-json\n',
+                b'data: [DONE]\n',
+                b'data: {"choices": [{"delta": {"content": "ignored"}}]}\n',
+            ]:
+                yield line
+
+        mock_response = Mock()
+        mock_response.content = frames()
+
+        with patch.object(client._ensure_session(), 'post') as mock_post:
+            mock_post.return_value.__aenter__.return_value = mock_response
+
+            deltas = [delta async for delta in client.chat_completion_stream(
+                model="test-model",
+                messages=[{"role": "user", "content": "test"}]
+            )]
+
+            assert deltas == ["Hello", ", world"]
+            request_data = json.loads(mock_post.call_args[1]['data'])
+            assert request_data["stream"] is True
+            assert request_data["messages"] == [{"role": "user", "content": "test"}]
+
+    def test_prepare_payload_cached(self, client):
+        """Test that payload templates are cached per configuration."""
+        tools = [{"type": "function", "function": {"name": "test_tool"}}]
+
+        template = client.prepare_payload("test-model", tools, temperature=0.5)
+
+        assert template is client.prepare_payload("test-model", tools, temperature=0.5)
+        assert template["tools"] == tools
+        assert template["tool_choice"] == "auto"
+        assert "messages" not in template
+        with pytest.raises(TypeError):
+            template["model"] = "other-model"
+
+    def test_tools_key_encodes_each_list_once(self):
+        """Test that a reused tool list is serialized only on first use, in caller order."""
+        tools = [{"type": "function", "function": {"name": "b_tool", "description": "x"}}]
+
+        with patch('services.openrouter_client.json.dumps', wraps=json.dumps) as spy_dumps:
+            key = _tools_key(tools)
+            assert _tools_key(tools) is key
+
+        spy_dumps.assert_called_once()
+        assert key == json.dumps(tools)
+        assert _tools_key([]) is None
+
+    def test_tools_key_reencodes_mutated_list(self):
+        """Test that appending to or replacing tools in a reused list changes its key."""
+        tools = [{"type": "function", "function": {"name": "a_tool"}}]
+        first = _tools_key(tools)
+
+        tools.append({"type": "function", "function": {"name": "b_tool"}})
+        appended = _tools_key(tools)
+        tools[0] = {"type": "function", "function": {"name": "c_tool"}}
+        replaced = _tools_key(tools)
+
+        assert appended != first
+        assert replaced == json.dumps(tools)
+
+    async def test_chat_completion_body_reuses_encoded_prefix(self, client, mock_openrouter_response):
+        """Test that only the messages are encoded per request."""
+        mock_response = Mock()
+        mock_response.raise_for_status = Mock(return_value=None)
+        mock_response.read = AsyncMock(return_value=json.dumps(mock_openrouter_response).encode())
+        tools = [{"type": "function", "function": {"name": "test_tool"}}]
+
+        with patch.object(client._ensure_session(), 'post') as mock_post, \
+             patch('services.openrouter_client._payload_template', wraps=_payload_template) as mock_template:
+            mock_post.return_value.__aenter__.return_value = mock_response
+            _payload_prefix.cache_clear()
+
+            for content in ("first", "second"):
+                await client.chat_completion(
+                    model="test-model",
+                    messages=[{"role": "user", "content": content}],
+                    tools=tools,
+                    temperature=0.5
+                )
+
+            bodies = [json.loads(call[1]['data']) for call in mock_post.call_args_list]
+            assert bodies[1] == {
+                "model": "test-model",
+                "temperature": 0.5,
+                "tools": tools,
+                "tool_choice": "auto",
+                "messages": [{"role": "user", "content": "second"}]
+            }
+            assert mock_template.call_count == 1
+
     def test_extract_response_content(self, client, mock_openrouter_response):
         """Test extracting content from response."""
         content = client.extract_response_content(mock_openrouter_response)
@@ -144,6 +250,18 @@ class TestOpenRouterClient:
         tool_calls = client.extract_tool_calls(mock_openrouter_response)
         assert tool_calls == []
 
+    @pytest.mark.benchmark
+    def test_extract_response_content_perf(self, client, mock_openrouter_response, benchmark):
+        """Benchmark content extraction, which runs once per LLM response."""
+        content = benchmark(client.extract_response_content, mock_openrouter_response)
+        assert content == "Test response content"
+
+    @pytest.mark.benchmark
+    def test_extract_tool_calls_perf(self, client, mock_openrouter_response, benchmark):
+        """Benchmark tool call extraction, which runs once per LLM response."""
+        tool_calls = benchmark(client.extract_tool_calls, mock_openrouter_response)
+        assert tool_calls == []
+
     def test_get_usage_info(self, client, mock_openrouter_response):
         """Test extracting usage information."""
         usage = client.get_usage_info(mock_openrouter_response)
@@ -162,23 +280,39 @@ class TestOpenRouterClient:
         assert usage["completion_tokens"] == 0
         assert usage["total_tokens"] == 0
 
-    @pytest.mark.asyncio
     async def test_list_models(self, client):
         """Test listing available models."""
         mock_models = {"data": [{"id": "model1"}, {"id": "model2"}]}
 
-        with patch.object(client.session, 'get') as mock_get:
-            mock_response = AsyncMock()
-            mock_response.raise_for_status.return_value = None
-            mock_response.json.return_value = mock_models
-            mock_get.return_value = mock_response
+        mock_response = Mock(status=200, headers={})
+        mock_response.raise_for_status = Mock(return_value=None)
+        mock_response.read = AsyncMock(return_value=json.dumps(mock_models).encode())
+
+        with patch.object(client._ensure_session(), 'get') as mock_get:
+            mock_get.return_value.__aenter__.return_value = mock_response
+
+            models = await client.list_models()
+
+            assert models == [{"id": "model1"}, {"id": "model2"}]
+
+    async def test_list_models_revalidates_with_etag(self, client):
+        """Test that a 304 revalidation returns the cached model list."""
+        fresh = Mock(status=200, headers={"ETag": '"v1"'})
+        fresh.read = AsyncMock(return_value=b'{"data": [{"id": "model1"}]}')
+        not_modified = Mock(status=304, headers={})
+
+        client.session = Mock(closed=False, close=AsyncMock())
+        client.session.get.return_value.__aenter__ = AsyncMock(side_effect=[fresh, not_modified])
+        client.session.get.return_value.__aexit__ = AsyncMock(return_value=None)
 
-            async with client:
-                models = await client.list_models()
+        first = await client.list_models()
+        second = await client.list_models()
 
-                assert models == [{"id": "model1"}, {"id": "model2"}]
+        assert first == second == [{"id": "model1"}]
+        assert client.session.get.call_args_list[0][1]["headers"] == {}
+        assert client.session.get.call_args_list[1][1]["headers"] == {"If-None-Match": '"v1"'}
+        not_modified.raise_for_status.assert_not_called()
 
-    @pytest.mark.asyncio
     async def test_validate_connection_success(self, client):
         """Test successful connection validation."""
         with patch.object(client, 'list_models') as mock_list:
@@ -187,7 +321,6 @@ class TestOpenRouterClient:
             result = await client.validate_connection()
             assert result is True
 
-    @pytest.mark.asyncio
     async def test_validate_connection_failure(self, client):
         """Test failed connection validation."""
         with patch.object(client, 'list_models') as mock_list:
@@ -196,6 +329,391 @@ class TestOpenRouterClient:
             result = await client.validate_connection()
             assert result is False
 
+class TestSearchAPI:
+    """Test search API integrations."""
+
+    @pytest.fixture
+    def search_api(self):
+        """Create SearchAPI instance."""
+        return SearchAPI()
+
+    async def test_read_perplexity_stream(self, search_api):
+        """Test assembling content from streamed SSE frames."""
+        async def frames():
+            for line in [
+                b'data: {"choices": [{"delta": {"content": "Hello"}}]}\n',
+                b'\n',
+                b'data: {"choices": [{"delta": {"content": ", world"}}]}\n',
+                b'data: not-json\n',
+                b'data: [DONE]\n',
+                b'data: {"choices": [{"delta": {"content": "ignored"}}]}\n',
+            ]:
+                yield line
+
+        mock_response = Mock()
+        mock_response.content = frames()
+
+        content = await search_api._read_perplexity_stream(mock_response)
+
+        assert content == "Hello, world"
+
+    async def test_search_google_paginates(self, search_api):
+        """Test that large Google requests are split into concurrent pages."""
+        search_api.google_api_key = "google-key"
+        search_api.google_cse_id = "cse-id"
+
+        with patch.object(search_api, '_google_page', new_callable=AsyncMock) as mock_page:
+            mock_page.side_effect = lambda session, query, start, num, **kwargs: [
+                {"url": f"https://example.com/{start + i}"} for i in range(num)
+            ]
+
+            results = await search_api.search_google("test", num_results=25)
+
+            assert len(results) == 25
+            pages = [(c.args[2], c.args[3]) for c in mock_page.call_args_list]
+            assert pages == [(1, 10), (11, 10), (21, 5)]
+
+    async def test_search_google_honours_start(self, search_api):
+        """Test that a caller-supplied start offsets every page's request params."""
+        search_api.google_api_key = "google-key"
+        search_api.google_cse_id = "cse-id"
+
+        session = Mock()
+        session.get.return_value.__aenter__ = AsyncMock(return_value=Mock())
+        session.get.return_value.__aexit__ = AsyncMock(return_value=False)
+        session_cm = Mock()
+        session_cm.__aenter__ = AsyncMock(return_value=session)
+        session_cm.__aexit__ = AsyncMock(return_value=False)
+
+        with patch('services.search_api.aiohttp.ClientSession', return_value=session_cm), \
+             patch.object(search_api, '_read_json', new_callable=AsyncMock, return_value={"items": [{"link": "u"}]}):
+            results = await search_api.search_google("test", num_results=15, start=11, site_search="example.com")
+
+        params = [c.kwargs["params"] for c in session.get.call_args_list]
+        assert [(p["start"], p["num"]) for p in params] == [(11, 10), (21, 5)]
+        assert all(p["siteSearch"] == "example.com" for p in params)
+        assert len(results) == 2
+
+    async def test_search_google_stops_at_result_100(self, search_api):
+        """Test that pages past Google's 100-result limit are never requested."""
+        search_api.google_api_key = "google-key"
+        search_api.google_cse_id = "cse-id"
+
+        with patch.object(search_api, '_google_page', new_callable=AsyncMock, return_value=[]) as mock_page:
+            await search_api.search_google("test", num_results=30, start=85)
+
+        pages = [(c.args[2], c.args[3]) for c in mock_page.call_args_list]
+        assert pages == [(85, 10), (95, 6)]
+
+    async def test_read_json_rejects_html_error_page(self, search_api):
+        """Test that HTML error pages are not decoded as JSON."""
+        mock_response = Mock(status=403, content_type="text/html")
+        mock_response.text = AsyncMock(return_value="<html>Quota exceeded</html>")
+        mock_response.read = AsyncMock()
+
+        data = await search_api._read_json(mock_response, "bing")
+
+        assert data is None
+        mock_response.read.assert_not_called()
+
+    def test_combine_results_merges_equivalent_urls(self, search_api):
+        """Test that URLs differing only by host case or trailing slash merge."""
+        combined = search_api.combine_results({
+            "google": [{"url": "https://Example.com/page/"}, {"url": "https://other.com"}],
+            "bing": [{"url": "https://example.com/page"}],
+        })
+
+        assert len(combined) == 2
+        assert combined[0]["url"] == "https://Example.com/page/"
+        assert combined[0]["search_sources"] == ["google", "bing"]
+
+    def test_combine_results_tolerates_malformed_urls(self, search_api):
+        """Test that one unparseable URL is deduplicated instead of failing the merge."""
+        combined = search_api.combine_results({
+            "google": [{"url": "http://[::1/x"}, {"url": "https://example.com"}],
+            "bing": [{"url": "HTTP://[::1/x "}],
+        })
+
+        assert [r["url"] for r in combined] == ["http://[::1/x", "https://example.com"]
+        assert combined[0]["search_sources"] == ["google", "bing"]
+
+SAMPLE_HTML = """<html lang="en">
+<head>
+    <title> Sample Page </title>
+    <meta name="description" content="A sample page">
+    <meta property="og:title" content="OG Sample">
+    <meta name="twitter:card" content="summary">
+    <script>var x = 1;</script>
+</head>
+<body>
+    <nav><a href="/home" title="Home">Home</a></nav>
+    <main><p>Main   content
+    here.</p><a href="https://other.com/page">Other <b>page</b></a></main>
+</body>
+</html>"""
+
+class TestWebScraper:
+    """Test web scraping utilities."""
+
+    @pytest.fixture
+    def scraper(self):
+        """Create WebScraper instance."""
+        return WebScraper()
+
+    async def test_shared_session_reused(self):
+        """Test that scrapers share one session unless asked not to."""
+        try:
+            async with WebScraper() as first, WebScraper() as second:
+                assert first.session is second.session
+
+            assert not first.session.closed
+
+            async with WebScraper(shared=False) as isolated:
+                assert isolated.session is not first.session
+
+            assert isolated.session.closed
+        finally:
+            await aclose_shared_session()
+
+    async def test_shared_session_from_other_loop_closed(self):
+        """Test that a session created on another event loop is closed when replaced."""
+        async def open_session():
+            return await web_scraper.get_session()
+
+        try:
+            stale = await asyncio.to_thread(asyncio.run, open_session())
+
+            session = await web_scraper.get_session()
+
+            assert session is not stale
+            assert stale.closed
+            assert not session.closed
+        finally:
+            await aclose_shared_session()
+
+    async def test_scrape_multiple_urls_bounded(self, scraper):
+        """Test that batch scraping keeps order and caps concurrency."""
+        urls = [f"https://example.com/{i}" for i in range(5)]
+        in_flight = 0
+        peak = 0
+
+        async def fake_scrape(url, extract_type="text"):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            if url.endswith("/3"):
+                raise RuntimeError("boom")
+            return {"url": url, "success": True}
+
+        scraper.session = Mock()
+        scraper.max_concurrent = 2
+
+        with patch.object(scraper, 'scrape_url', side_effect=fake_scrape):
+            results = await scraper.scrape_multiple_urls(urls)
+
+        assert [r["url"] for r in results] == urls
+        assert results[3] == {"url": urls[3], "error": "boom", "success": False}
+        assert peak <= 2
+
+    async def test_scrape_urls_as_completed(self, scraper):
+        """Test that streamed batch results arrive in completion order."""
+        urls = ["https://example.com/slow", "https://example.com/fast"]
+
+        async def fake_scrape(url, extract_type="text"):
+            if url.endswith("slow"):
+                await asyncio.sleep(0.01)
+            return {"url": url, "success": True}
+
+        scraper.session = Mock()
+
+        with patch.object(scraper, 'scrape_url', side_effect=fake_scrape):
+            results = [r async for r in scraper.scrape_urls_as_completed(urls)]
+
+        assert [r["url"] for r in results] == list(reversed(urls))
+
+    async def test_request_delay_is_per_host(self, scraper):
+        """Test that only repeat requests to the same host are delayed."""
+        scraper.request_delay = 30
+
+        with patch('services.web_scraper.asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
+            await scraper._wait_for_host("https://a.com/1")
+            await scraper._wait_for_host("https://b.com/1")
+            mock_sleep.assert_not_called()
+
+            await scraper._wait_for_host("https://a.com/2")
+            mock_sleep.assert_called_once()
+
+    def test_extract_text_content(self, scraper):
+        """Test extracting readable text from HTML."""
+        result = scraper._extract_text_content(SAMPLE_HTML, "https://example.com")
+
+        assert result["success"] is True
+        assert result["title"] == "Sample Page"
+        assert result["description"] == "A sample page"
+        assert result["content"] == "Main content here. Other page"
+        assert result["word_count"] == 5
+
+    def test_extract_text_content_fast_parser(self, scraper):
+        """Test that the selectolax fast path matches the BeautifulSoup output."""
+        pytest.importorskip("selectolax")
+        expected = scraper._extract_text_content(SAMPLE_HTML, "https://example.com")
+
+        with patch('services.web_scraper.config.fast_parser', True), \
+                patch('services.web_scraper._extract_text_content_fast',
+                      wraps=web_scraper._extract_text_content_fast) as fast:
+            result = scraper._extract_text_content(SAMPLE_HTML.encode(), "https://example.com")
+
+        fast.assert_called_once()
+        assert result == expected
+
+    def test_extract_text_content_without_bs4(self, scraper):
+        """Test that raw content is returned when BeautifulSoup is unavailable."""
+        with patch('services.web_scraper._HAS_BS4', False):
+            result = scraper._extract_text_content(SAMPLE_HTML.encode(), "https://example.com")
+
+        assert result["content"] == SAMPLE_HTML
+        assert result["note"] == "BeautifulSoup not available for parsing"
+
+    def test_extract_links(self, scraper):
+        """Test extracting absolute links from HTML."""
+        result = scraper._extract_links(SAMPLE_HTML, "https://example.com/docs/")
+
+        assert result["success"] is True
+        assert result["links"] == [
+            {"url": "https://example.com/home", "text": "Home", "title": "Home"},
+            {"url": "https://other.com/page", "text": "Other page", "title": ""},
+        ]
+        assert result["link_count"] == 2
+
+    def test_extract_metadata(self, scraper):
+        """Test extracting metadata from HTML and headers."""
+        result = scraper._extract_metadata(
+            SAMPLE_HTML, "https://example.com", {"Content-Type": "text/html", "Set-Cookie": "a=b"}
+        )
+
+        assert result["success"] is True
+        assert result["headers"] == {"Content-Type": "text/html"}
+        assert result["title"] == "Sample Page"
+        assert result["language"] == "en"
+        assert result["meta_tags"]["description"] == "A sample page"
+        assert result["open_graph"] == {"title": "OG Sample"}
+        assert result["twitter_cards"] == {"card": "summary"}
+
+    async def test_scrape_url_parses_raw_bytes(self, scraper):
+        """Test that the response body is read as bytes and decoded with its charset."""
+        mock_response = Mock()
+        mock_response.read = AsyncMock(return_value=SAMPLE_HTML.replace("Main", "Caf\u00e9").encode("latin-1"))
+        mock_response.charset = "ISO-8859-1"
+        scraper.session = Mock()
+        scraper.session.get.return_value.__aenter__ = AsyncMock(return_value=mock_response)
+        scraper.session.get.return_value.__aexit__ = AsyncMock(return_value=None)
+
+        result = await scraper.scrape_url("https://example.com")
+
+        assert result["content"].startswith("Caf\u00e9 content here.")
+        mock_response.text.assert_not_called()
+
+    async def test_scrape_url_caches_successful_results(self, scraper):
+        """Test that repeat scrapes are served from the LRU cache."""
+        scraper.session = Mock()
+        scraper._cache_max = 1
+        fetch = AsyncMock(side_effect=lambda url, extract_type: {"url": url, "success": True})
+
+        with patch.object(scraper, '_fetch_url', fetch):
+            await scraper.scrape_url("https://example.com/a?utm_source=x")
+            second = await scraper.scrape_url("https://example.com/a")
+            second["success"] = False
+            third = await scraper.scrape_url("https://example.com/a?gclid=y")
+            await scraper.scrape_url("https://example.com/b")
+            await scraper.scrape_url("https://example.com/a")
+
+        assert second["url"] == "https://example.com/a"
+        assert third["url"] == "https://example.com/a?gclid=y"
+        assert third["success"] is True
+        assert fetch.await_count == 3
+
+    async def test_large_documents_parsed_in_process_pool(self):
+        """Test that documents over the offload threshold are parsed in worker processes."""
+        with patch('services.web_scraper._OFFLOAD_MIN_BYTES', 0):
+            result = await _run_parser("links", SAMPLE_HTML.encode(), "https://example.com/docs/")
+
+        await aclose_shared_session()
+        assert web_scraper._parse_pool is not None
+
+        shutdown_parse_pool()
+
+        assert web_scraper._parse_pool is None
+        assert result["link_count"] == 2
+
+    async def test_scrape_url_head_only(self, scraper):
+        """Test that head_only issues a HEAD request and returns only the kept headers."""
+        mock_response = Mock()
+        mock_response.headers = {"Content-Type": "text/html", "Set-Cookie": "id=secret", "X-Request-Id": "1"}
+        mock_response.status = 200
+        scraper.session = Mock()
+        scraper.session.head.return_value.__aenter__ = AsyncMock(return_value=mock_response)
+        scraper.session.head.return_value.__aexit__ = AsyncMock(return_value=None)
+
+        result = await scraper.scrape_url("https://example.com", extract_type="head_only")
+
+        assert result["headers"] == {"Content-Type": "text/html"}
+        scraper.session.get.assert_not_called()
+
+    async def test_read_head_stops_at_head_end(self):
+        """Test that only the body prefix up to </head> is read."""
+        body = SAMPLE_HTML.encode()
+
+        async def iter_chunked(size):
+            for i in range(0, len(body), size):
+                yield body[i:i + size]
+
+        stream = Mock()
+        stream.iter_chunked = iter_chunked
+
+        head = await _read_head(stream, chunk_size=16)
+
+        assert head.endswith(b"</head>")
+        assert b"<body>" not in head
+
+    @pytest.mark.parametrize("url,expected", [
+        ("https://example.com/a", True),
+        ("ftp://example.com/file", True),
+        ("/relative/path", False),
+        ("mailto:someone@example.com", False),
+        ("", False),
+    ])
+    def test_is_valid_url(self, scraper, url, expected):
+        """Test URL validation."""
+        assert scraper.is_valid_url(url) is expected
+
+    def test_clean_url_removes_tracking_params(self, scraper):
+        """Test that tracking parameters are stripped from URLs."""
+        cleaned = scraper.clean_url("https://example.com/a?utm_source=x&id=5&fbclid=y")
+
+        assert cleaned == "https://example.com/a?id=5"
+
+class TestServerSentEvents:
+    """Test the shared SSE delta parser."""
+
+    async def test_iter_sse_deltas_accepts_message_frames(self):
+        """Test that full-message frames yield content alongside delta frames."""
+        async def frames():
+            for line in [
+                b': keep-alive\n',
+                b'data: {"choices": []}\n',
+                b'data: {"choices": [{"delta": {"content": "Hi"}}]}\n',
+                b'data: {"choices": [{"message": {"content": " there"}}]}\n',
+                b'data:[DONE]\n',
+            ]:
+                yield line
+
+        mock_response = Mock()
+        mock_response.content = frames()
+
+        assert [delta async for delta in iter_sse_deltas(mock_response)] == ["Hi", " there"]
+
 class TestLogger:
     """Test logging functionality."""
 
@@ -220,6 +738,16 @@ class TestLogger:
         # They should be the same object (cached)
         assert logger1 is logger2
 
+    def test_get_agent_logger_skips_logging_lookup_when_cached(self):
+        """Test that repeated lookups are served from the cache."""
+        logger = get_agent_logger("cached_agent")
+
+        with patch('services.logger.logging.getLogger') as mock_get_logger:
+            assert get_agent_logger("cached_agent") is logger
+
+        mock_get_logger.assert_not_called()
+        assert len(logger.handlers) == 1
+
     @patch('services.logger.logging')
     def test_setup_logging_with_file(self, mock_logging):
         """Test logging setup with file output."""
@@ -2,14 +2,16 @@
 
 import pytest
 import asyncio
+import json
 from unittest.mock import Mock, patch, AsyncMock
 
-from utils.retry import retry_with_backoff, retry_sync_with_backoff, CircuitBreaker
+from utils.communication import AgentCommunication
+from utils.validators import sanitize_content, validate_agent_name, validate_content, validate_topic, validate_url
+from utils.retry import retry_with_backoff, retry_sync_with_backoff, CircuitBreaker, CircuitState, _backoff_delays, _delay_schedule
 
 class TestRetryDecorator:
     """Test retry decorator functionality."""
 
-    @pytest.mark.asyncio
     async def test_retry_with_backoff_success(self):
         """Test successful function call with no retries needed."""
         call_count = 0
@@ -25,7 +27,6 @@ class TestRetryDecorator:
         assert result == "success"
         assert call_count == 1
 
-    @pytest.mark.asyncio
     async def test_retry_with_backoff_eventual_success(self):
         """Test function that fails initially but succeeds on retry."""
         call_count = 0
@@ -43,7 +44,6 @@ class TestRetryDecorator:
         assert result == "success"
         assert call_count == 2
 
-    @pytest.mark.asyncio
     async def test_retry_with_backoff_exhaust_retries(self):
         """Test function that exhausts all retries."""
         call_count = 0
@@ -59,7 +59,6 @@ class TestRetryDecorator:
 
         assert call_count == 3  # initial call + 2 retries
 
-    @pytest.mark.asyncio
     async def test_retry_with_backoff_custom_exceptions(self):
         """Test retry with custom exception types."""
         call_count = 0
@@ -75,7 +74,6 @@ class TestRetryDecorator:
 
         assert call_count == 3
 
-    @pytest.mark.asyncio
     async def test_retry_with_backoff_ignored_exception(self):
         """Test that non-matching exceptions are not retried."""
         call_count = 0
@@ -91,6 +89,36 @@ class TestRetryDecorator:
 
         assert call_count == 1  # No retries for non-matching exception
 
+    async def test_retry_with_backoff_logs_attempts(self, caplog):
+        """Test that lazily formatted retry log records render as before."""
+        call_count = 0
+
+        @retry_with_backoff(max_retries=1, base_delay=0.5, jitter=False)
+        async def flaky():
+            nonlocal call_count
+            call_count += 1
+            if call_count < 2:
+                raise ValueError("boom")
+            return "ok"
+
+        with patch('utils.retry.asyncio.sleep', new_callable=AsyncMock), caplog.at_level("INFO", logger="utils.retry"):
+            assert await flaky() == "ok"
+
+        messages = [record.getMessage() for record in caplog.records]
+        assert messages[0] == "Attempt 1 failed for flaky: boom. Retrying in 0.50 seconds..."
+        assert messages[1].startswith("Operation flaky succeeded on attempt 2 after ")
+
+    async def test_retry_with_backoff_first_attempt_skips_timing(self):
+        """Test that a call succeeding on its first attempt never reads the clock."""
+        @retry_with_backoff(max_retries=2)
+        async def test_function():
+            return "success"
+
+        with patch('utils.retry.time.perf_counter') as mock_clock:
+            assert await test_function() == "success"
+
+        mock_clock.assert_not_called()
+
     def test_retry_sync_with_backoff_success(self):
         """Test synchronous retry decorator."""
         call_count = 0
@@ -108,7 +136,28 @@ class TestRetryDecorator:
         assert result == "success"
         assert call_count == 2
 
-    @pytest.mark.asyncio
+    def test_backoff_delays_capped_schedule(self):
+        """Test that the precomputed backoff schedule grows exponentially up to the cap."""
+        assert _backoff_delays(5, 1.0, 5.0, 2.0) == (1.0, 2.0, 4.0, 5.0, 5.0)
+        assert _backoff_delays(0, 1.0, 5.0, 2.0) == ()
+
+    def test_delay_schedule_jitter(self):
+        """Test that jitter scales each delay into [delay / 2, delay]."""
+        delays = (1.0, 2.0)
+
+        assert _delay_schedule(delays, jitter=False)(1) == 2.0
+        jittered = _delay_schedule(delays, jitter=True)
+        assert all(1.0 <= jittered(1) <= 2.0 for _ in range(100))
+
+    def test_jitter_lookup_table(self):
+        """Test that the jitter table covers [0.5, 1.0] evenly and consecutive draws differ."""
+        from utils.retry import _JITTER_LUT
+
+        assert len(_JITTER_LUT) == 256
+        assert min(_JITTER_LUT) == 0.5 and max(_JITTER_LUT) == 1.0
+        jittered = _delay_schedule((1.0,), jitter=True)
+        assert len({jittered(0) for _ in range(256)}) == 256
+
     async def test_retry_with_backoff_jitter(self):
         """Test retry with jitter enabled."""
         call_count = 0
@@ -128,7 +177,6 @@ class TestRetryDecorator:
             # Verify sleep was called with jittered values
             assert mock_sleep.call_count == 2
 
-    @pytest.mark.asyncio
     async def test_retry_with_backoff_custom_delays(self):
         """Test retry with custom delay parameters."""
         call_count = 0
@@ -184,7 +232,6 @@ class TestCircuitBreaker:
         assert cb.state == 'OPEN'
         assert cb._can_attempt() is False
 
-    @pytest.mark.asyncio
     async def test_circuit_breaker_half_open_after_timeout(self):
         """Test circuit breaker transitions to half-open after timeout."""
         cb = CircuitBreaker(failure_threshold=1, recovery_timeout=0.1)
@@ -199,7 +246,80 @@ class TestCircuitBreaker:
         assert cb._can_attempt() is True
         assert cb.state == 'HALF_OPEN'
 
-    @pytest.mark.asyncio
+    async def test_circuit_breaker_single_probe_in_half_open(self):
+        """Test that only one call probes a half-open circuit at a time."""
+        cb = CircuitBreaker(failure_threshold=1, recovery_timeout=0.5)
+        cb._record_failure()
+        cb._last_failure_mono -= 1.0  # recovery timeout has elapsed
+        release = asyncio.Event()
+
+        async def probe():
+            await release.wait()
+            return "recovered"
+
+        probe_task = asyncio.create_task(cb.call(probe))
+        await asyncio.sleep(0)
+        assert cb.state == 'HALF_OPEN'
+
+        async def success_function():
+            return "success"
+
+        with pytest.raises(Exception, match="Circuit breaker is OPEN"):
+            await cb.call(success_function)
+
+        release.set()
+        assert await probe_task == "recovered"
+        assert cb.state == 'CLOSED'
+        assert await cb.call(success_function) == "success"
+
+    async def test_circuit_breaker_probe_released_on_unexpected_error(self):
+        """Test that an unexpected error during a probe frees the probe slot."""
+        cb = CircuitBreaker(failure_threshold=1, recovery_timeout=0.5, expected_exception=ValueError)
+        cb._record_failure()
+        cb._last_failure_mono -= 1.0  # recovery timeout has elapsed
+
+        async def crash():
+            raise KeyError("unexpected")
+
+        with pytest.raises(KeyError):
+            await cb.call(crash)
+
+        assert cb._can_attempt() is True
+
+    def test_circuit_state_compares_with_names(self):
+        """Test that enum states stay interchangeable with their string names."""
+        cb = CircuitBreaker()
+
+        assert cb.state is CircuitState.CLOSED
+        assert cb.state == 'CLOSED'
+        assert cb.state != 'OPEN'
+        assert not cb.state != 'CLOSED'
+        assert str(CircuitState.HALF_OPEN) == 'HALF_OPEN'
+        assert {CircuitState.OPEN: 1}[CircuitState.OPEN] == 1
+
+    def test_circuit_state_hashes_and_serializes_as_names(self):
+        """Test that states behave like their names in sets, dicts and JSON."""
+        cb = CircuitBreaker()
+        cb.state = CircuitState.OPEN
+
+        assert cb.state in {'OPEN', 'HALF_OPEN'}
+        assert {'OPEN': 'x'}.get(cb.state) == 'x'
+        assert hash(cb.state) == hash('OPEN')
+        assert json.dumps(cb.state) == '"OPEN"'
+
+    def test_circuit_breaker_recovery_uses_monotonic_clock(self):
+        """Test that the recovery timeout is measured on the monotonic clock."""
+        cb = CircuitBreaker(failure_threshold=1, recovery_timeout=60.0)
+
+        with patch('utils.retry.time.monotonic', return_value=1000.0):
+            cb._record_failure()
+        with patch('utils.retry.time.monotonic', return_value=1030.0):
+            assert cb._can_attempt() is False
+        with patch('utils.retry.time.monotonic', return_value=1061.0):
+            assert cb._can_attempt() is True
+
+        assert cb.state == 'HALF_OPEN'
+
     async def test_circuit_breaker_success_recovery(self):
         """Test circuit breaker recovery after successful call."""
         cb = CircuitBreaker(failure_threshold=1, recovery_timeout=0.1)
@@ -214,7 +334,6 @@ class TestCircuitBreaker:
         assert cb.state == 'CLOSED'
         assert cb.failure_count == 0
 
-    @pytest.mark.asyncio
     async def test_circuit_breaker_failure_in_half_open(self):
         """Test circuit breaker failure while in half-open state."""
         cb = CircuitBreaker(failure_threshold=1, recovery_timeout=0.1)
@@ -229,7 +348,6 @@ class TestCircuitBreaker:
 
         assert cb.state == 'OPEN'
 
-    @pytest.mark.asyncio
     async def test_circuit_breaker_call_success(self):
         """Test successful circuit breaker call."""
         cb = CircuitBreaker()
@@ -243,7 +361,6 @@ class TestCircuitBreaker:
         assert cb.state == 'CLOSED'
         assert cb.failure_count == 0
 
-    @pytest.mark.asyncio
     async def test_circuit_breaker_call_failure(self):
         """Test failed circuit breaker call."""
         cb = CircuitBreaker(failure_threshold=1)
@@ -257,7 +374,6 @@ class TestCircuitBreaker:
         assert cb.state == 'OPEN'
         assert cb.failure_count == 1
 
-    @pytest.mark.asyncio
     async def test_circuit_breaker_open_blocks_calls(self):
         """Test that open circuit breaker blocks calls."""
         cb = CircuitBreaker(failure_threshold=1)
@@ -274,4 +390,269 @@ class TestCircuitBreaker:
             return "success"
 
         with pytest.raises(Exception, match="Circuit breaker is OPEN"):
-            await cb.call(success_function)
\ No newline at end of file
+            await cb.call(success_function)
+
+class TestAgentCommunication:
+    """Test the indexed agent message store."""
+
+    def test_send_and_receive(self):
+        """Test that pending messages are delivered once, in send order."""
+        comm = AgentCommunication()
+        comm.send_message("master", "writer", "draft", {"n": 1})
+        comm.send_message("master", "researcher", "search", {})
+        comm.send_message("master", "writer", "revise", {"n": 2})
+
+        messages = comm.receive_messages("writer")
+
+        assert [msg["action"] for msg in messages] == ["draft", "revise"]
+        assert all(msg["status"] == "received" for msg in messages)
+        assert comm.receive_messages("writer") == []
+        assert comm.get_message_stats() == {"total": 3, "sent": 1, "received": 2, "pending": 1}
+
+    def test_message_ids_unique_in_bursts(self):
+        """Test that messages sent back to back get distinct IDs."""
+        comm = AgentCommunication()
+        ids = [comm.send_message("master", "writer", "draft", {}) for _ in range(1000)]
+
+        assert len(set(ids)) == 1000
+        assert comm.get_message_by_id(ids[-1]) is comm.message_queue[-1]
+
+    def test_get_message_by_id(self):
+        """Test looking up a message by its ID."""
+        comm = AgentCommunication()
+        message_id = comm.send_message("master", "writer", "draft", {})
+
+        assert comm.get_message_by_id(message_id)["action"] == "draft"
+        assert comm.get_message_by_id("missing") is None
+
+    def test_clear_messages_for_agent(self):
+        """Test that clearing an agent drops messages it sent or received."""
+        comm = AgentCommunication()
+        comm.send_message("master", "writer", "draft", {})
+        comm.send_message("writer", "master", "done", {})
+        comm.send_message("master", "researcher", "search", {})
+
+        comm.clear_messages("writer")
+
+        assert [msg["action"] for msg in comm.message_queue] == ["search"]
+        assert comm.receive_messages("master") == []
+        assert comm.get_message_stats() == {"total": 1, "sent": 1, "received": 0, "pending": 1}
+
+    def test_clear_messages_compacts_recipient_inbox(self):
+        """Test that clearing a sender drops its pending messages from other inboxes."""
+        comm = AgentCommunication()
+        for _ in range(3):
+            comm.send_message("researcher", "writer", "notes", {})
+        comm.send_message("master", "writer", "draft", {})
+
+        comm.clear_messages("researcher")
+
+        assert len(comm._inbox["writer"]) == 1
+        assert [msg["action"] for msg in comm.receive_messages("writer")] == ["draft"]
+
+    def test_clear_messages_sent_to_self(self):
+        """Test clearing an agent that messaged itself."""
+        comm = AgentCommunication()
+        message_id = comm.send_message("writer", "writer", "note", {})
+        comm.send_message("master", "editor", "review", {})
+
+        comm.clear_messages("writer")
+
+        assert comm.get_message_by_id(message_id) is None
+        assert comm.receive_messages("writer") == []
+        assert comm.get_message_stats()["pending"] == 1
+
+    def test_message_stats_match_recount(self):
+        """Test that the running counters agree with a full recount after mixed operations."""
+        comm = AgentCommunication()
+        agents = ["master", "writer", "researcher", "editor"]
+        for i in range(200):
+            comm.send_message(agents[i % 4], agents[(i * 3 + 1) % 4], "work", {"i": i})
+            if i % 7 == 0:
+                comm.receive_messages(agents[i % 4])
+            if i % 50 == 49:
+                comm.clear_messages(agents[(i // 50) % 4])
+
+        statuses = [msg["status"] for msg in comm.message_queue]
+        assert comm.get_message_stats() == {
+            "total": len(statuses),
+            "sent": statuses.count("sent"),
+            "received": statuses.count("received"),
+            "pending": statuses.count("sent"),
+        }
+
+    def test_clear_all_messages(self):
+        """Test clearing every message."""
+        comm = AgentCommunication()
+        comm.send_message("master", "writer", "draft", {})
+
+        comm.clear_messages()
+
+        assert comm.message_queue == []
+        assert comm.receive_messages("writer") == []
+        assert comm.get_message_stats()["total"] == 0
+
+    def test_message_queue_is_live_read_only_view(self):
+        """Test that message_queue tracks the store without copying and rejects mutation."""
+        comm = AgentCommunication()
+        view = comm.message_queue
+        ids = [comm.send_message("master", "writer", f"step_{i}", {}) for i in range(5)]
+
+        assert comm.message_queue is view
+        assert len(view) == 5
+        assert [view[i]["id"] for i in range(-5, 5)] == ids + ids
+        assert [msg["action"] for msg in view[1:3]] == ["step_1", "step_2"]
+        with pytest.raises(IndexError):
+            view[5]
+        with pytest.raises(AttributeError):
+            view.append({})
+        with pytest.raises(AttributeError):
+            comm.message_queue = []
+
+        comm.clear_messages("master")
+
+        assert view == []
+
+class TestValidators:
+    """Test content and name validators."""
+
+    @pytest.mark.parametrize("topic,expected", [
+        ("AI in healthcare", True),
+        ("  ab  ", False),
+        ("123 456", False),
+        ("x" * 201, False),
+        (None, False),
+    ])
+    def test_validate_topic(self, topic, expected):
+        """Test topic validation rules."""
+        assert validate_topic(topic) is expected
+
+    @pytest.mark.parametrize("name,expected", [
+        ("web_researcher", True),
+        ("keyword-gen2", True),
+        ("Master", False),
+        ("bad name", False),
+        ("a", False),
+    ])
+    def test_validate_agent_name(self, name, expected):
+        """Test agent name validation, including reserved names."""
+        assert validate_agent_name(name) is expected
+
+    def test_name_and_topic_validation_is_memoized(self):
+        """Test that repeat validations hit the cache and unhashable input is still rejected."""
+        from utils.validators import _check_agent_name, _check_topic
+
+        validate_agent_name("cache_probe_agent")
+        validate_topic("Cache probe topic")
+        agent_hits = _check_agent_name.cache_info().hits
+        topic_hits = _check_topic.cache_info().hits
+
+        assert validate_agent_name("cache_probe_agent") is True
+        assert validate_topic("Cache probe topic") is True
+        assert _check_agent_name.cache_info().hits == agent_hits + 1
+        assert _check_topic.cache_info().hits == topic_hits + 1
+        assert validate_topic(["not", "a", "string"]) is False
+        assert validate_agent_name({"name": "x"}) is False
+
+    def test_validate_content_stats(self):
+        """Test the shared content statistics."""
+        results = validate_content("one two\nthree\n")
+
+        assert results["stats"] == {"length": 14, "word_count": 3, "line_count": 3}
+
+    def test_validate_content_rejects_non_string(self):
+        """Test that non-string content is reported as invalid instead of raising."""
+        results = validate_content(None)
+
+        assert results["is_valid"] is False
+        assert results["issues"] == ["Content is empty or not a string"]
+
+    @pytest.mark.parametrize("url", [
+        "https://example.com/path?q=1",
+        "http://localhost:8080",
+        "svn+ssh://host/repo",
+        "http:///path",
+        "http://?q=1",
+        " http://x",
+        "\x01http://x",
+        "http://\nx",
+        "ht\ttp://x",
+        "http:// x",
+        "http://[::1]:8080",
+        "http://[x",
+        "mailto:someone@example.com",
+        "//example.com",
+        "example.com",
+        "",
+    ])
+    def test_validate_url_matches_urlparse(self, url):
+        """Test that the fast URL check agrees with the strict urlparse check."""
+        assert validate_url(url) is validate_url(url, strict=True)
+
+    def test_validate_url_rejects_non_strings(self):
+        """Test that non-string URLs are rejected."""
+        assert validate_url(None) is False
+        assert validate_url(b"https://example.com", strict=True) is False
+
+    def test_validate_linkedin_post(self):
+        """Test LinkedIn post checks."""
+        results = validate_content("Is AI ready for production? #AI #ML " + "word " * 60, "linkedin_post")
+
+        assert results["linkedin_checks"] == {"hashtag_count": 2, "question_count": 1}
+        assert results["is_valid"] is True
+
+    def test_validate_voice_dialog(self):
+        """Test voice dialog checks."""
+        content = "[Intro] Welcome (pause) to the show. [Emphasis: today] we talk AI. (Pause)"
+
+        checks = validate_content(content, "voice_dialog")["voice_checks"]
+
+        assert checks["has_timing_indicators"] is True
+        assert checks["pause_count"] == 2
+        assert checks["emphasis_count"] == 1
+        assert "Content is very short for audio" in validate_content(content, "voice_dialog")["warnings"]
+
+    def test_validate_linkedin_post_without_hashtags(self):
+        """Test that a post without hashtags is flagged."""
+        results = validate_content("Plain update with no tags. " * 10, "linkedin_post")
+
+        assert results["linkedin_checks"]["hashtag_count"] == 0
+        assert "No hashtags found" in results["warnings"]
+
+    @pytest.mark.parametrize("content,expected", [
+        ("[Intro] (Pause) [Emphasis: key point]", (True, 1, 1)),
+        ("[Emphasis: stress] only", (True, 0, 1)),
+        ("[x (Pause) y] (PAUSE)", (True, 2, 0)),
+        ("[note [Emphasis: nested]", (True, 0, 1)),
+        ("[Emphasis:[Emphasis: ]", (True, 0, 1)),
+        ("[Emphasis: a (Pause) b] (pause)", (True, 2, 1)),
+        ("[Emphasis: unclosed\n[Emphasis: closed]", (True, 0, 1)),
+        ("[Emphasis: unclosed", (False, 0, 0)),
+        ("[unclosed\n] (pause)", (False, 1, 0)),
+        ("no markup at all", (False, 0, 0)),
+    ])
+    def test_validate_voice_dialog_markup_counts(self, content, expected):
+        """Test the single-pass voice markup counts on mixed and nested cues."""
+        checks = validate_content(content, "voice_dialog")["voice_checks"]
+
+        assert (checks["has_timing_indicators"], checks["pause_count"], checks["emphasis_count"]) == expected
+
+    def test_validate_topic_content(self):
+        """Test vocabulary diversity for topic content."""
+        checks = validate_content("The cat saw the dog", "topic")["topic_checks"]
+
+        assert checks == {"word_count": 5, "vocabulary_diversity": 0.8}
+
+    @pytest.mark.parametrize("content,expected", [
+        ("  plain text  ", "plain text"),
+        ("a\x00b\r\nc\rd", "ab\nc\nd"),
+        ("\r\x00\n", ""),
+        ("", ""),
+    ])
+    def test_sanitize_content(self, content, expected):
+        """Test NUL removal and line ending normalization."""
+        assert sanitize_content(content) == expected
+
+    def test_sanitize_content_truncates(self):
+        """Test that long content is truncated with an ellipsis."""
+        assert sanitize_content("x" * 20, max_length=5) == "xxxxx..."
\ No newline at end of file
@@ -1,69 +1,171 @@
 """Agent communication utilities."""
 
+import itertools
 import json
-from typing import Dict, Any, Optional
+import sys
+import time
+from collections import defaultdict, deque
+from collections.abc import Sequence
+from typing import Dict, Any, DefaultDict, Deque, Iterator, Optional
 from datetime import datetime
 
+# Interned status values so status checks resolve on the identity fast path
+_SENT = sys.intern("sent")
+_RECEIVED = sys.intern("received")
+
+class _MessageView(Sequence):
+    """Live, read-only sequence over stored messages in send order."""
+
+    __slots__ = ("_messages",)
+
+    def __init__(self, messages: Dict[int, Dict[str, Any]]):
+        self._messages = messages
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self._messages.values())
+
+    def __reversed__(self) -> Iterator[Dict[str, Any]]:
+        return reversed(self._messages.values())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        size = len(self._messages)
+        if index < -size or index >= size:
+            raise IndexError("message index out of range")
+        # Walk from whichever end is nearer, so the first and last messages are O(1)
+        if index < 0:
+            return next(itertools.islice(reversed(self), -index - 1, None))
+        if index > size // 2:
+            return next(itertools.islice(reversed(self), size - index - 1, None))
+        return next(itertools.islice(self, index, None))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, _MessageView)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
 class AgentCommunication:
     """Handles communication between agents."""
 
     def __init__(self):
-        self.message_queue = []
+        # Messages keyed by send sequence, with indexes so no operation scans the whole store
+        self._messages: Dict[int, Dict[str, Any]] = {}
+        self._by_id: Dict[str, int] = {}
+        self._inbox: DefaultDict[str, Deque[int]] = defaultdict(deque)
+        self._by_agent: DefaultDict[str, Dict[int, None]] = defaultdict(dict)
+        self._next_seq = 0
+        self._pending = 0
+        self._id_counter = itertools.count()
+        self._message_view = _MessageView(self._messages)
+
+    @property
+    def message_queue(self) -> Sequence:
+        """Read-only live view of all stored messages in the order they were sent.
+
+        Mutating or reassigning it is unsupported; use send_message and clear_messages.
+        """
+        return self._message_view
 
     def send_message(self, from_agent: str, to_agent: str, action: str, payload: Dict[str, Any]) -> str:
         """Send a message from one agent to another."""
+        # Agent names come from a small closed set; interning shares one copy per name
+        from_agent = sys.intern(from_agent)
+        to_agent = sys.intern(to_agent)
         message = {
-            "id": f"msg_{int(datetime.utcnow().timestamp() * 1000)}",
+            # Nanosecond clock plus a per-instance counter keeps ids unique within bursts
+            "id": f"msg_{time.time_ns()}_{next(self._id_counter)}",
             "from_agent": from_agent,
             "to_agent": to_agent,
             "action": action,
             "payload": payload,
             "timestamp": datetime.utcnow().isoformat(),
-            "status": "sent"
+            "status": _SENT
         }
 
-        self.message_queue.append(message)
+        seq = self._next_seq
+        self._next_seq += 1
+        self._messages[seq] = message
+        self._by_id.setdefault(message["id"], seq)
+        self._inbox[to_agent].append(seq)
+        self._by_agent[from_agent][seq] = None
+        self._by_agent[to_agent][seq] = None
+        self._pending += 1
         return message["id"]
 
     def receive_messages(self, agent_name: str) -> list:
         """Receive messages for a specific agent."""
-        messages = [
-            msg for msg in self.message_queue
-            if msg["to_agent"] == agent_name and msg["status"] == "sent"
-        ]
+        inbox = self._inbox.pop(agent_name, None)
+        if not inbox:
+            return []
+
+        messages = [self._messages[seq] for seq in inbox]
 
         # Mark messages as received
         for msg in messages:
-            msg["status"] = "received"
+            msg["status"] = _RECEIVED
 
+        self._pending -= len(messages)
         return messages
 
     def get_message_by_id(self, message_id: str) -> Optional[Dict[str, Any]]:
         """Get a message by its ID."""
-        for msg in self.message_queue:
-            if msg["id"] == message_id:
-                return msg
-        return None
+        seq = self._by_id.get(message_id)
+        return None if seq is None else self._messages[seq]
 
     def clear_messages(self, agent_name: Optional[str] = None) -> None:
         """Clear messages from the queue."""
-        if agent_name:
-            self.message_queue = [
-                msg for msg in self.message_queue
-                if msg["from_agent"] != agent_name and msg["to_agent"] != agent_name
-            ]
-        else:
-            self.message_queue.clear()
+        if not agent_name:
+            self._messages.clear()
+            self._by_id.clear()
+            self._inbox.clear()
+            self._by_agent.clear()
+            self._pending = 0
+            return
+
+        self._inbox.pop(agent_name, None)
+
+        # Only this agent's messages are visited; the other party's index is unlinked per message
+        messages, by_id, by_agent = self._messages, self._by_id, self._by_agent
+        cleared_pending = 0
+        stale_inboxes = set()
+        for seq in by_agent.pop(agent_name, ()):
+            msg = messages.pop(seq)
+            if msg["status"] == _SENT:
+                cleared_pending += 1
+                stale_inboxes.add(msg["to_agent"])
+            by_id.pop(msg["id"], None)
+
+            other = msg["to_agent"] if msg["from_agent"] == agent_name else msg["from_agent"]
+            if other in by_agent:
+                by_agent[other].pop(seq, None)
+
+        self._pending -= cleared_pending
+
+        # Rebuild each recipient inbox that held a cleared pending message, once
+        stale_inboxes.discard(agent_name)
+        for recipient in stale_inboxes:
+            inbox = deque(seq for seq in self._inbox.get(recipient, ()) if seq in messages)
+            if inbox:
+                self._inbox[recipient] = inbox
+            else:
+                self._inbox.pop(recipient, None)
 
     def get_message_stats(self) -> Dict[str, int]:
-        """Get statistics about messages in the queue."""
-        total = len(self.message_queue)
-        sent = len([msg for msg in self.message_queue if msg["status"] == "sent"])
-        received = len([msg for msg in self.message_queue if msg["status"] == "received"])
+        """Get statistics about messages in the queue from the running counters."""
+        total = len(self._messages)
 
         return {
             "total": total,
-            "sent": sent,
-            "received": received,
-            "pending": sent
+            "sent": self._pending,
+            "received": total - self._pending,
+            "pending": self._pending
         }
\ No newline at end of file
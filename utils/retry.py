@@ -2,12 +2,45 @@
 
 import asyncio
 import functools
+import itertools
+import random
+import time
+from enum import Enum
 from typing import Callable, Any, Type, Optional
 import logging
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Dedicated generator for backoff jitter, separate from the shared module-level one
+_RNG = random.Random()
+
+# 256 jitter factors spanning [0.5, 1.0], shuffled once and then read round-robin
+_JITTER_LUT = tuple(_RNG.sample([0.5 + i / 510 for i in range(256)], 256))
+_jitter_index = itertools.count()
+
+def _backoff_delays(
+    max_retries: int,
+    base_delay: float,
+    max_delay: float,
+    exponential_base: float
+) -> tuple:
+    """Precompute the capped exponential delay before each retry."""
+    return tuple(
+        min(base_delay * (exponential_base ** attempt), max_delay)
+        for attempt in range(max_retries)
+    )
+
+def _delay_schedule(delays: tuple, jitter: bool) -> Callable[[int], float]:
+    """Choose the per-attempt delay function once, so wrappers never branch on jitter."""
+    if not jitter:
+        return delays.__getitem__
+
+    def jittered(attempt: int, _factors=_JITTER_LUT, _next_index=_jitter_index.__next__) -> float:
+        return delays[attempt] * _factors[_next_index() & 0xff]
+
+    return jittered
+
 def retry_with_backoff(
     max_retries: int = 3,
     base_delay: float = 1.0,
@@ -28,49 +61,46 @@ def retry_with_backoff(
     """
 
     def decorator(func: Callable) -> Callable:
+        next_delay = _delay_schedule(
+            _backoff_delays(max_retries, base_delay, max_delay, exponential_base), jitter
+        )
+
         @functools.wraps(func)
         async def wrapper(*args, **kwargs) -> Any:
             last_exception = None
 
             for attempt in range(max_retries + 1):
+                # Only retried attempts log their timing, and only when INFO is enabled
+                timed = attempt > 0 and logger.isEnabledFor(logging.INFO)
                 try:
-                    start_time = datetime.utcnow()
+                    start_time = time.perf_counter() if timed else 0.0
                     result = await func(*args, **kwargs)
-                    duration = (datetime.utcnow() - start_time).total_seconds() * 1000
 
-                    if attempt > 0:
+                    if timed:
+                        duration = (time.perf_counter() - start_time) * 1000
                         logger.info(
-                            f"Operation {func.__name__} succeeded on attempt {attempt + 1} "
-                            f"after {duration:.2f}ms"
+                            "Operation %s succeeded on attempt %d after %.2fms",
+                            func.__name__, attempt + 1, duration
                         )
 
                     return result
 
                 except exceptions as e:
                     last_exception = e
-                    duration = (datetime.utcnow() - start_time).total_seconds() * 1000
 
                     if attempt == max_retries:
                         logger.error(
-                            f"Operation {func.__name__} failed after {max_retries + 1} attempts. "
-                            f"Final error: {e}"
+                            "Operation %s failed after %d attempts. Final error: %s",
+                            func.__name__, max_retries + 1, e
                         )
                         break
 
-                    # Calculate delay with exponential backoff
-                    delay = min(
-                        base_delay * (exponential_base ** attempt),
-                        max_delay
-                    )
-
-                    # Add jitter if enabled
-                    if jitter:
-                        import random
-                        delay = delay * (0.5 + random.random() * 0.5)
+                    # Exponential backoff from the precomputed schedule, jittered if enabled
+                    delay = next_delay(attempt)
 
                     logger.warning(
-                        f"Attempt {attempt + 1} failed for {func.__name__}: {e}. "
-                        f"Retrying in {delay:.2f} seconds..."
+                        "Attempt %d failed for %s: %s. Retrying in %.2f seconds...",
+                        attempt + 1, func.__name__, e, delay
                     )
 
                     await asyncio.sleep(delay)
@@ -91,52 +121,48 @@ def retry_sync_with_backoff(
     """Synchronous version of retry_with_backoff decorator."""
 
     def decorator(func: Callable) -> Callable:
+        next_delay = _delay_schedule(
+            _backoff_delays(max_retries, base_delay, max_delay, exponential_base), jitter
+        )
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs) -> Any:
             last_exception = None
 
             for attempt in range(max_retries + 1):
+                # Only retried attempts log their timing, and only when INFO is enabled
+                timed = attempt > 0 and logger.isEnabledFor(logging.INFO)
                 try:
-                    start_time = datetime.utcnow()
+                    start_time = time.perf_counter() if timed else 0.0
                     result = func(*args, **kwargs)
-                    duration = (datetime.utcnow() - start_time).total_seconds() * 1000
 
-                    if attempt > 0:
+                    if timed:
+                        duration = (time.perf_counter() - start_time) * 1000
                         logger.info(
-                            f"Operation {func.__name__} succeeded on attempt {attempt + 1} "
-                            f"after {duration:.2f}ms"
+                            "Operation %s succeeded on attempt %d after %.2fms",
+                            func.__name__, attempt + 1, duration
                         )
 
                     return result
 
                 except exceptions as e:
                     last_exception = e
-                    duration = (datetime.utcnow() - start_time).total_seconds() * 1000
 
                     if attempt == max_retries:
                         logger.error(
-                            f"Operation {func.__name__} failed after {max_retries + 1} attempts. "
-                            f"Final error: {e}"
+                            "Operation %s failed after %d attempts. Final error: %s",
+                            func.__name__, max_retries + 1, e
                         )
                         break
 
-                    # Calculate delay with exponential backoff
-                    delay = min(
-                        base_delay * (exponential_base ** attempt),
-                        max_delay
-                    )
-
-                    # Add jitter if enabled
-                    if jitter:
-                        import random
-                        delay = delay * (0.5 + random.random() * 0.5)
+                    # Exponential backoff from the precomputed schedule, jittered if enabled
+                    delay = next_delay(attempt)
 
                     logger.warning(
-                        f"Attempt {attempt + 1} failed for {func.__name__}: {e}. "
-                        f"Retrying in {delay:.2f} seconds..."
+                        "Attempt %d failed for %s: %s. Retrying in %.2f seconds...",
+                        attempt + 1, func.__name__, e, delay
                     )
 
-                    import time
                     time.sleep(delay)
 
             raise last_exception
@@ -144,8 +170,22 @@ def retry_sync_with_backoff(
         return wrapper
     return decorator
 
+class CircuitState(str, Enum):
+    """Circuit breaker states; being str-valued, they compare, hash and serialize as their names."""
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+
+    def __str__(self) -> str:
+        return self.value
+
 class CircuitBreaker:
-    """Circuit breaker pattern implementation."""
+    """Circuit breaker pattern implementation.
+
+    State only changes in synchronous code between awaits, so each transition is
+    atomic on the event loop and no lock is taken. While HALF_OPEN, a single
+    probe call is let through at a time.
+    """
 
     def __init__(
         self,
@@ -158,39 +198,50 @@ class CircuitBreaker:
         self.expected_exception = expected_exception
         self.failure_count = 0
         self.last_failure_time = None
-        self.state = 'CLOSED'  # CLOSED, OPEN, HALF_OPEN
+        self._last_failure_mono: Optional[float] = None  # monotonic clock, for the recovery check
+        self.state = CircuitState.CLOSED
+        self._probing = False
 
     def _can_attempt(self) -> bool:
         """Check if operation can be attempted."""
-        if self.state == 'CLOSED':
+        if self.state is CircuitState.CLOSED:
             return True
 
-        if self.state == 'OPEN':
-            if self.last_failure_time and \
-               (datetime.utcnow() - self.last_failure_time).total_seconds() > self.recovery_timeout:
-                self.state = 'HALF_OPEN'
+        if self.state is CircuitState.OPEN:
+            if self._last_failure_mono is not None and \
+               time.monotonic() - self._last_failure_mono > self.recovery_timeout:
+                self.state = CircuitState.HALF_OPEN
+                self._probing = True
                 return True
             return False
 
-        return True  # HALF_OPEN state
+        # HALF_OPEN state: only one probe in flight
+        if self._probing:
+            return False
+        self._probing = True
+        return True
 
     def _record_success(self):
         """Record successful operation."""
         self.failure_count = 0
-        self.state = 'CLOSED'
+        self.state = CircuitState.CLOSED
+        self._probing = False
 
     def _record_failure(self):
         """Record failed operation."""
         self.failure_count += 1
         self.last_failure_time = datetime.utcnow()
+        self._last_failure_mono = time.monotonic()
 
         if self.failure_count >= self.failure_threshold:
-            self.state = 'OPEN'
+            self.state = CircuitState.OPEN
+        self._probing = False
 
     async def call(self, func: Callable, *args, **kwargs) -> Any:
         """Execute function with circuit breaker protection."""
         if not self._can_attempt():
             raise Exception("Circuit breaker is OPEN")
+        is_probe = self.state is CircuitState.HALF_OPEN
 
         try:
             result = await func(*args, **kwargs)
@@ -198,4 +249,8 @@ class CircuitBreaker:
             return result
         except self.expected_exception as e:
             self._record_failure()
-            raise e
\ No newline at end of file
+            raise e
+        finally:
+            # Release the probe slot even if an unexpected exception escaped
+            if is_probe:
+                self._probing = False
\ No newline at end of file
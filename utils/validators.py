@@ -1,69 +1,92 @@
 """Data validation utilities."""
 
+import functools
 import re
 from typing import Dict, Any, List
 from urllib.parse import urlparse
 
+# Patterns compiled once at import instead of looked up in re's cache per call
+_ALPHA_RE = re.compile(r'[a-zA-Z]')
+_HASHTAG_RE = re.compile(r'#\w+')
+# Emphasis cues are consumed whole so overlapping cues count once; other brackets only
+# consume their '[' so pauses inside them are still counted
+_VOICE_MARKUP_RE = re.compile(
+    r'(?P<emphasis>\[Emphasis:[^\]\n]*\])|(?P<timing>\[(?=[^\]\n]*\]))|(?P<pause>\(Pause\))',
+    re.IGNORECASE
+)
+_WORD_RE = re.compile(r'\b\w+\b')
+_AGENT_NAME_RE = re.compile(r'^[a-zA-Z0-9_-]+$')
+_URL_RE = re.compile(r'[a-zA-Z][a-zA-Z0-9+.\-]*://[^/?#]')  # scheme followed by a netloc
+# urlparse strips these leading characters; URLs with tabs, newlines (dropped anywhere) or
+# IPv6 brackets (which it can reject) take the full parse
+_URL_LEADING_JUNK = ''.join(map(chr, range(0x21)))
+_URL_PARSE_CHARS = frozenset('\t\r\n[]')
+
+_RESERVED_AGENT_NAMES = frozenset({'system', 'admin', 'root', 'master', 'agent'})
+
 def validate_topic(topic: str) -> bool:
     """Validate that a topic string is acceptable."""
     if not topic or not isinstance(topic, str):
         return False
-
-    # Check length
-    if len(topic.strip()) < 3:
-        return False
-
-    if len(topic.strip()) > 200:
+    return _check_topic(topic)
+
+@functools.lru_cache(maxsize=512)
+def _check_topic(topic: str) -> bool:
+    """Apply the topic rules to a non-empty string; results are memoized."""
+    # Check length on a single stripped copy
+    length = len(topic.strip())
+    if length < 3 or length > 200:
         return False
 
     # Check for basic content
-    if not re.search(r'[a-zA-Z]', topic):
-        return False
-
-    return True
+    return _ALPHA_RE.search(topic) is not None
 
 def validate_content(content: str, content_type: str = "general") -> Dict[str, Any]:
     """Validate content and return validation results."""
+    is_str = isinstance(content, str)
+
+    # Split once; every check below reuses these counts
+    word_count = len(content.split()) if is_str else 0
     results = {
         "is_valid": True,
         "issues": [],
         "warnings": [],
         "stats": {
-            "length": len(content),
-            "word_count": len(content.split()),
-            "line_count": len(content.split('\n'))
+            "length": len(content) if is_str else 0,
+            "word_count": word_count,
+            "line_count": content.count('\n') + 1 if is_str else 0
         }
     }
 
     # Basic validation
-    if not content or not isinstance(content, str):
+    if not content or not is_str:
         results["is_valid"] = False
         results["issues"].append("Content is empty or not a string")
         return results
 
     # Content type specific validation
     if content_type == "linkedin_post":
-        results.update(_validate_linkedin_post(content))
+        results.update(_validate_linkedin_post(content, word_count))
     elif content_type == "voice_dialog":
-        results.update(_validate_voice_dialog(content))
+        results.update(_validate_voice_dialog(content, word_count))
     elif content_type == "topic":
-        results.update(_validate_topic_content(content))
+        results.update(_validate_topic_content(content, word_count))
 
     # General content checks
     if len(content.strip()) < 10:
         results["warnings"].append("Content is very short")
 
-    if len(content.split()) > 1000:
+    if word_count > 1000:
         results["warnings"].append("Content is very long")
 
     return results
 
-def _validate_linkedin_post(content: str) -> Dict[str, Any]:
+def _validate_linkedin_post(content: str, word_count: int) -> Dict[str, Any]:
     """Validate LinkedIn post content."""
     results = {"linkedin_checks": {}}
 
-    # Check for hashtags
-    hashtag_count = len(re.findall(r'#\w+', content))
+    # Check for hashtags; the substring test skips the regex for posts without any '#'
+    hashtag_count = len(_HASHTAG_RE.findall(content)) if '#' in content else 0
     results["linkedin_checks"]["hashtag_count"] = hashtag_count
 
     if hashtag_count == 0:
@@ -72,14 +95,13 @@ def _validate_linkedin_post(content: str) -> Dict[str, Any]:
         results["warnings"] = results.get("warnings", []) + ["Too many hashtags"]
 
     # Check length
-    word_count = len(content.split())
     if word_count < 50:
         results["warnings"] = results.get("warnings", []) + ["Post is quite short"]
     elif word_count > 300:
         results["warnings"] = results.get("warnings", []) + ["Post is quite long"]
 
     # Check for questions (engagement)
-    question_count = len(re.findall(r'\?', content))
+    question_count = content.count('?')
     results["linkedin_checks"]["question_count"] = question_count
 
     if question_count == 0:
@@ -87,24 +109,25 @@ def _validate_linkedin_post(content: str) -> Dict[str, Any]:
 
     return results
 
-def _validate_voice_dialog(content: str) -> Dict[str, Any]:
+def _validate_voice_dialog(content: str, word_count: int) -> Dict[str, Any]:
     """Validate voice dialog content."""
     results = {"voice_checks": {}}
 
-    # Check for timing indicators
-    has_timing = bool(re.search(r'\[.*?\]', content))
-    results["voice_checks"]["has_timing_indicators"] = has_timing
-
-    # Check for pauses
-    pause_count = len(re.findall(r'\(Pause\)', content, re.IGNORECASE))
-    results["voice_checks"]["pause_count"] = pause_count
+    # Count timing, pause and emphasis cues in one pass
+    counts = {"emphasis": 0, "timing": 0, "pause": 0}
+    if '[' in content or '(' in content:  # plain dialog never enters the regex engine
+        for match in _VOICE_MARKUP_RE.finditer(content):
+            counts[match.lastgroup] += 1
+            if match.lastgroup == "emphasis":
+                # A pause cannot span the closing ']', so any inside the cue lie wholly within it
+                counts["pause"] += match.group().lower().count("(pause)")
 
-    # Check for emphasis indicators
-    emphasis_count = len(re.findall(r'\[Emphasis:.*?\]', content, re.IGNORECASE))
-    results["voice_checks"]["emphasis_count"] = emphasis_count
+    # Emphasis cues are bracketed, so they count as timing indicators too
+    results["voice_checks"]["has_timing_indicators"] = bool(counts["timing"] or counts["emphasis"])
+    results["voice_checks"]["pause_count"] = counts["pause"]
+    results["voice_checks"]["emphasis_count"] = counts["emphasis"]
 
     # Estimate duration (rough calculation: 150 words per minute)
-    word_count = len(content.split())
     estimated_minutes = word_count / 150
     results["voice_checks"]["estimated_duration_minutes"] = round(estimated_minutes, 1)
 
@@ -115,24 +138,29 @@ def _validate_voice_dialog(content: str) -> Dict[str, Any]:
 
     return results
 
-def _validate_topic_content(content: str) -> Dict[str, Any]:
+def _validate_topic_content(content: str, word_count: int) -> Dict[str, Any]:
     """Validate topic content."""
     results = {"topic_checks": {}}
 
     # Check for keywords
-    word_count = len(content.split())
     results["topic_checks"]["word_count"] = word_count
 
     # Check for diversity of vocabulary
-    words = re.findall(r'\b\w+\b', content.lower())
+    words = _WORD_RE.findall(content.lower())
     unique_words = set(words)
     vocabulary_diversity = len(unique_words) / len(words) if words else 0
     results["topic_checks"]["vocabulary_diversity"] = round(vocabulary_diversity, 3)
 
     return results
 
-def validate_url(url: str) -> bool:
-    """Validate that a string is a valid URL."""
+def validate_url(url: str, strict: bool = False) -> bool:
+    """Validate that a string is a valid URL; strict=True parses it fully with urlparse."""
+    if not isinstance(url, str):
+        return False
+
+    if not strict and _URL_PARSE_CHARS.isdisjoint(url):
+        return _URL_RE.match(url.lstrip(_URL_LEADING_JUNK)) is not None
+
     try:
         result = urlparse(url)
         return all([result.scheme, result.netloc])
@@ -154,18 +182,21 @@ def validate_agent_name(name: str) -> bool:
     """Validate that an agent name is acceptable."""
     if not name or not isinstance(name, str):
         return False
+    return _check_agent_name(name)
 
+@functools.lru_cache(maxsize=1024)
+def _check_agent_name(name: str) -> bool:
+    """Apply the agent name rules to a non-empty string; results are memoized."""
     # Check length
     if len(name.strip()) < 2 or len(name.strip()) > 50:
         return False
 
     # Check for valid characters (alphanumeric, underscore, dash)
-    if not re.match(r'^[a-zA-Z0-9_-]+$', name):
+    if not _AGENT_NAME_RE.match(name):
         return False
 
     # Check for reserved names
-    reserved_names = ['system', 'admin', 'root', 'master', 'agent']
-    if name.lower() in reserved_names:
+    if name.lower() in _RESERVED_AGENT_NAMES:
         return False
 
     return True
@@ -179,10 +210,12 @@ def sanitize_content(content: str, max_length: int = 10000) -> str:
     if len(content) > max_length:
         content = content[:max_length] + "..."
 
-    # Remove null bytes
-    content = content.replace('\x00', '')
+    # Remove null bytes; the membership scans skip the copies for clean input
+    if '\x00' in content:
+        content = content.replace('\x00', '')
 
     # Normalize line endings
-    content = content.replace('\r\n', '\n').replace('\r', '\n')
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
 
     return content.strip()
\ No newline at end of file